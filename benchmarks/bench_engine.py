@@ -0,0 +1,71 @@
+"""Benchmark validating configs with the pydantic, and the fast engine
+
+Validates the same config repeatedly, and reports the throughput (configs
+per second) of instantiating the config type (pydantic), and of the compiled
+validation function (`typedconfig.engine`).
+
+Usage::
+
+  python benchmarks/bench_engine.py [--leaves 500] [--configs 200]
+
+"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+
+from typedconfig.engine import compile_validator
+from typedconfig.parsers.tree import get_config_t
+
+_leaf_types = [
+    ({"type": "int", "default": 1}, 2),
+    ({"type": "PositiveFloat"}, 0.5),
+    ({"type": "Literal", "opts": ["foo", "bar"]}, "bar"),
+    ({"type": "conint", "opts": {"gt": 0, "le": 10}}, 7),
+    ({"type": "str"}, "baz"),
+    ({"type": "bool"}, False),
+    ({"type": "Path"}, "/tmp/foo"),
+]
+
+
+def make_rules_conf(nleaves: int, width: int = 10):
+    """Ruleset with `nleaves` leaves in sections 2 levels deep, and a config"""
+    rules: dict = {}
+    conf: dict = {}
+    for i in range(nleaves):
+        section, key = f"s{i // width}", f"leaf{i % width}"
+        rule, value = _leaf_types[i % len(_leaf_types)]
+        rules.setdefault(section, {})[key] = dict(rule)
+        conf.setdefault(section, {})[key] = value
+    return rules, conf
+
+
+def throughput(func, conf: dict, nconfigs: int) -> float:
+    start = perf_counter()
+    for _ in range(nconfigs):
+        func(conf)
+    return nconfigs / (perf_counter() - start)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--leaves", type=int, default=500)
+    parser.add_argument("--configs", type=int, default=200)
+    args = parser.parse_args()
+
+    rules, conf = make_rules_conf(args.leaves)
+    config_t = get_config_t(rules)
+    validate = compile_validator(config_t)
+    assert validate(conf) == config_t(**conf)
+
+    results = {
+        "pydantic": throughput(lambda c: config_t(**c), conf, args.configs),
+        "fast": throughput(validate, conf, args.configs),
+    }
+    print(f"{args.leaves} leaves, {args.configs} configs")
+    for name, rate in results.items():
+        print(f"{name:>16}: {rate:10.1f} configs/s")
+    print(f"{'speedup':>16}: {results['fast'] / results['pydantic']:10.2f} x")
+
+
+if __name__ == "__main__":
+    main()
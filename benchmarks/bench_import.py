@@ -0,0 +1,76 @@
+"""Benchmark the import time of the package modules
+
+Every module is imported in a fresh interpreter with ``python -X importtime``,
+and the cumulative import time of the module is reported (best of
+`--repeat`), along with the slowest packages it imports.
+
+Usage::
+
+  python benchmarks/bench_import.py [--repeat 5] [--top 5] [modules ...]
+
+"""
+
+from argparse import ArgumentParser
+import os
+from pathlib import Path
+import subprocess
+import sys
+from typing import Dict
+
+_modules = [
+    "typedconfig.helpers",
+    "typedconfig.parsers.tree",
+    "typedconfig.parsers.graph",
+    "typedconfig.batch",
+]
+
+
+def importtime(module: str) -> Dict[str, int]:
+    """Cumulative import time (us) of the module, and of every package"""
+    env = {**os.environ, "PYTHONPATH": str(Path(__file__).parent.parent)}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    times: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():  # header
+            continue
+        name = name.strip()
+        if name == module or "." not in name:
+            times[name] = max(times.get(name, 0), int(cumulative))
+    return times
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=_modules)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    startup = set(importtime("sys"))  # imported by the interpreter
+    for module in args.modules:
+        runs = [importtime(module) for _ in range(args.repeat)]
+        best = min(runs, key=lambda times: times[module])
+        deps = sorted(
+            (
+                (us, name)
+                for name, us in best.items()
+                if name not in startup and not name.startswith("typedconfig")
+            ),
+            reverse=True,
+        )[: args.top]
+        print(f"{module}: {best[module] / 1e3:.1f} ms")
+        for us, name in deps:
+            print(f"  {name:<30} {us / 1e3:>7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark rebuilding the config type after editing one leaf of a ruleset
+
+Compares building every type again (`get_config_t` without the cache) with
+`IncrementalBuilder`, which only rebuilds the edited section, and its
+ancestors.
+
+Usage::
+
+  python benchmarks/bench_incremental.py [--leaves 10000] [--edits 5]
+
+"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+
+from typedconfig.parsers.tree import get_config_t, IncrementalBuilder
+
+_leaf_types = [
+    {"type": "int", "default": 1},
+    {"type": "PositiveFloat"},
+    {"type": "Literal", "opts": ["foo", "bar"]},
+    {"type": "conint", "opts": {"gt": 0, "le": 10}},
+    {"type": "str", "optional": True},
+]
+
+
+def make_rules(nleaves: int, width: int = 10) -> dict:
+    """Ruleset with `nleaves` leaves in sections 3 levels deep"""
+    rules: dict = {}
+    for i in range(nleaves):
+        section = rules.setdefault(f"s{i // width ** 2}", {})
+        subsection = section.setdefault(f"ss{i // width % width}", {})
+        subsection[f"leaf{i % width}"] = dict(_leaf_types[i % len(_leaf_types)])
+    return rules
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--leaves", type=int, default=10_000)
+    parser.add_argument("--edits", type=int, default=5)
+    args = parser.parse_args()
+
+    rules = make_rules(args.leaves)
+    builder = IncrementalBuilder()
+    builder.build(rules)
+    print(f"{'edit':>6} {'full':>10} {'incremental':>12} {'speedup':>8}")
+    for i in range(args.edits):
+        # save a rules file with one leaf default changed
+        rules["s0"]["ss0"]["leaf0"]["default"] = i + 2
+
+        start = perf_counter()
+        get_config_t(rules, cache=False)
+        full = perf_counter() - start
+
+        start = perf_counter()
+        builder.build(rules)
+        incremental = perf_counter() - start
+        print(
+            f"{i:>6} {full * 1e3:>7.1f} ms {incremental * 1e3:>9.1f} ms "
+            f"{full / incremental:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
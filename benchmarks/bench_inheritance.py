@@ -0,0 +1,50 @@
+"""Benchmark `properties` with a long chain of derived properties
+
+Every property derives from the previous one, and overrides one attribute;
+the root property has a large nested attribute, which is inherited by all.
+
+Usage::
+
+  python benchmarks/bench_inheritance.py [--depth 500] [--size 1000]
+
+"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+import tracemalloc
+
+from typedconfig.parsers.graph import properties
+
+attr_rules = {
+    "name": {"type": "str"},
+    "costs": {"type": "Dict"},
+    "eff": {"type": "float", "optional": True},
+}
+
+
+def make_props(depth: int, size: int) -> dict:
+    costs = {f"cost{i}": {"value": float(i), "unit": "EUR"} for i in range(size)}
+    props = {"prop0": {"name": "prop0", "costs": costs}}
+    for i in range(1, depth):
+        props[f"prop{i}"] = {"parent": f"prop{i - 1}", "name": f"prop{i}"}
+    return props
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=500)
+    parser.add_argument("--size", type=int, default=1_000)
+    args = parser.parse_args()
+
+    props = make_props(args.depth, args.size)
+    tracemalloc.start()
+    start = perf_counter()
+    properties(attr_rules, {}, props, type_namespace="bench", share_types=True)
+    duration = perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"depth={args.depth}: {duration * 1e3:.0f} ms, {peak / 2**20:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark merging many override files into a large, deeply nested config
+
+Compares `merge_dicts` with the previous implementation, which counted the
+keys at every level, and scanned all inputs again for every key; and with
+folding the overrides into the base config with `merge_into`.  The
+overrides only replace leaves of the base config, so no key mixes
+dictionaries, and other values; the fold would differ from `merge_dicts`
+for inputs that do (see `merge_into`).
+
+Usage::
+
+  python benchmarks/bench_merge.py [--keys 50000] [--files 40] [--depth 6]
+
+"""
+
+from argparse import ArgumentParser
+from collections import Counter
+from functools import reduce
+from itertools import chain
+import random
+from time import perf_counter
+from typing import Any, Dict, List, Sequence
+
+from typedconfig.helpers import merge_dicts, merge_into
+
+
+def legacy_merge_dicts(confs: Sequence[Dict]) -> Dict:
+    if not all(map(lambda obj: isinstance(obj, dict), confs)):
+        return confs[-1]
+
+    res: Dict[str, Any] = {}
+    for key, count in Counter(chain.from_iterable(confs)).items():
+        matches = [conf[key] for conf in confs if key in conf]
+        if count > 1:
+            res[key] = legacy_merge_dicts(matches)
+        else:
+            res[key] = matches[0]
+    return res
+
+
+def make_base(nkeys: int, depth: int, width: int = 10) -> Dict:
+    """Config with about `nkeys` leaves, nested `depth` levels deep"""
+    base: Dict = {}
+    for i in range(nkeys):
+        node = base
+        for level in range(depth - 1):
+            node = node.setdefault(f"s{(i // width ** (level + 1)) % width}", {})
+        node[f"k{i}"] = i
+    return base
+
+
+def make_overrides(base: Dict, nfiles: int, nkeys: int, seed: int = 42) -> List:
+    """`nfiles` overrides, each with `nkeys` leaves of the base config"""
+    rng = random.Random(seed)
+    leaves: List = []
+
+    def walk(node, path):
+        for key, val in node.items():
+            if isinstance(val, dict):
+                walk(val, path + (key,))
+            else:
+                leaves.append(path + (key,))
+
+    walk(base, ())
+    overrides = []
+    for _ in range(nfiles):
+        override: Dict = {}
+        for path in rng.sample(leaves, nkeys):
+            reduce(lambda d, k: d.setdefault(k, {}), path[:-1], override)
+            reduce(lambda d, k: d[k], path[:-1], override)[path[-1]] = -1
+        overrides.append(override)
+    return overrides
+
+
+def fold(confs: Sequence[Dict]) -> Dict:
+    return reduce(merge_into, confs[1:], dict(confs[0]))
+
+
+def timeit(func, confs, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        func(confs)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=50_000)
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--overrides", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    base = make_base(args.keys, args.depth)
+    confs = [base, *make_overrides(base, args.files, args.overrides)]
+    expected = legacy_merge_dicts(confs)
+    print(f"{'impl':>12} {'time':>10}")
+    for name, func in [
+        ("legacy", legacy_merge_dicts),
+        ("merge_dicts", merge_dicts),
+        ("merge_into", fold),
+    ]:
+        assert func(confs) == expected
+        print(f"{name:>12} {timeit(func, confs, args.repeat) * 1e3:>7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark overriding property attributes per node
+
+Every node overrides one attribute of every property; compares creating a
+new property with `dataclasses.replace`, which validates all attributes,
+with a `PropertyOverlay`, which only validates the overridden attribute.
+
+Usage::
+
+  python benchmarks/bench_overlay.py [--nodes 1000] [--props 50]
+
+"""
+
+from argparse import ArgumentParser
+from dataclasses import replace
+from time import perf_counter
+import tracemalloc
+
+from typedconfig.parsers.graph import properties, PropertyOverlay
+
+attr_rules = {
+    "name": {"type": "str"},
+    "costs": {"type": "Dict"},
+    "lifetime": {"type": "PositiveInt"},
+    **{f"attr{i}": {"type": "PositiveFloat"} for i in range(20)},
+}
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=1_000)
+    parser.add_argument("--props", type=int, default=50)
+    args = parser.parse_args()
+
+    conf = {
+        f"prop{i}": {
+            "name": f"prop{i}",
+            "costs": {f"cost{j}": float(j) for j in range(10)},
+            "lifetime": 25,
+            **{f"attr{j}": 1.0 + j for j in range(20)},
+        }
+        for i in range(args.props)
+    }
+    props = properties(attr_rules, {}, conf, type_namespace="bench")
+    print(f"{'impl':>16} {'time':>10} {'memory':>10}")
+    for name, func in [("replace", replace), ("PropertyOverlay", PropertyOverlay)]:
+        tracemalloc.start()
+        start = perf_counter()
+        techs = [
+            {pname: func(props[pname], attr0=2.0 + i) for pname in conf}
+            for i in range(args.nodes)
+        ]
+        duration = perf_counter() - start
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:>16} {duration * 1e3:>7.0f} ms {size / 2**20:>7.1f} MB")
+        del techs
+
+
+if __name__ == "__main__":
+    main()
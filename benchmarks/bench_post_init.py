@@ -0,0 +1,93 @@
+"""Benchmark instantiating config types of increasing depth
+
+Compares `_ConfigIO.__post_init__` with the previous implementation, which
+looked up the fields, and expanded the defaults of every nested section for
+every instance.
+
+Usage::
+
+  python benchmarks/bench_post_init.py [--depth 8] [--width 5] [--number 200]
+
+"""
+
+from argparse import ArgumentParser
+from dataclasses import fields, is_dataclass, MISSING
+from time import perf_counter
+
+from typedconfig.parsers import _ConfigIO
+from typedconfig.parsers.tree import get_config_t
+
+
+def legacy_post_init(self):
+    for f in fields(self):
+        if is_dataclass(f.type):
+            defaults = {}
+            for _f in fields(f.type):
+                if _f.default != MISSING:
+                    val = _f.default
+                elif _f.default_factory != MISSING:
+                    val = _f.default_factory()
+                else:
+                    continue
+                defaults[_f.name] = val
+            kwargs = getattr(self, f.name)
+            setattr(self, f.name, f.type(**{**defaults, **kwargs}))
+
+
+def make_rules_conf(depth: int, width: int):
+    """`width` sections at the top level, each nested `depth` levels deep"""
+    rules: dict = {}
+    conf: dict = {}
+    for i in range(width):
+        _rules, _conf = rules.setdefault(f"s{i}", {}), conf.setdefault(f"s{i}", {})
+        for level in range(depth):
+            _rules.update(
+                {
+                    "x": {"type": "int"},
+                    "y": {"type": "float", "default": 1.0},
+                    "z": {"type": "str", "default": "foo"},
+                }
+            )
+            _conf["x"] = level
+            if level < depth - 1:
+                _rules = _rules.setdefault("sub", {})
+                _conf = _conf.setdefault("sub", {})
+    return rules, conf
+
+
+def timeit(config_t, conf: dict, number: int, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        for _ in range(number):
+            config_t(**conf)
+        best = min(best, (perf_counter() - start) / number)
+    return best
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--width", type=int, default=5)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    post_init = _ConfigIO.__post_init__
+    print(f"{'depth':>6} {'legacy':>12} {'current':>12} {'speedup':>8}")
+    for depth in range(1, args.depth + 1):
+        rules, conf = make_rules_conf(depth, args.width)
+        config_t = get_config_t(rules)
+        results = []
+        for impl in (legacy_post_init, post_init):
+            _ConfigIO.__post_init__ = impl  # type: ignore
+            results.append(timeit(config_t, conf, args.number))
+        _ConfigIO.__post_init__ = post_init  # type: ignore
+        legacy, current = results
+        print(
+            f"{depth:>6} {legacy * 1e6:>9.1f} us {current * 1e6:>9.1f} us "
+            f"{legacy / current:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark building many properties with, and without sharing their types
+
+Most properties in a large model use one of a few sets of attributes, with
+`share_types` they share one validated type per set of attributes (and
+parent type).  Reports the build time, the memory allocated while building,
+and the number of validation models created.
+
+Usage::
+
+  python benchmarks/bench_properties.py [--props 2000] [--kinds 10]
+
+"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+import tracemalloc
+
+from typedconfig.parsers.graph import properties
+
+attr_rules = {
+    "name": {"type": "str"},
+    **{f"attr{i}": {"type": "PositiveFloat", "optional": True} for i in range(10)},
+}
+
+
+def make_props(nprops: int, nkinds: int) -> dict:
+    """`nprops` properties, with `nkinds` distinct sets of attributes"""
+    props = {}
+    for i in range(nprops):
+        kind = i % nkinds
+        attrs = {f"attr{j}": 1.0 + j for j in range(10) if (kind >> j) & 1}
+        props[f"prop{i}"] = {"name": f"prop{i}", **attrs}
+    return props
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--props", type=int, default=2_000)
+    parser.add_argument("--kinds", type=int, default=10)
+    args = parser.parse_args()
+
+    props = make_props(args.props, args.kinds)
+    print(f"{'share_types':>12} {'time':>10} {'memory':>10} {'models':>6}")
+    for share_types in (False, True):
+        tracemalloc.start()
+        start = perf_counter()
+        res = properties(
+            attr_rules, {}, props, type_namespace="bench", share_types=share_types
+        )
+        duration = perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        ntypes = len({prop.__pydantic_model__ for prop in res.values()})
+        print(
+            f"{share_types!s:>12} {duration * 1e3:>7.0f} ms "
+            f"{peak / 2**20:>7.1f} MB {ntypes:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
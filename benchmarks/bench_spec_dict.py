@@ -0,0 +1,92 @@
+"""Benchmark `properties` with an increasing number of properties
+
+Compares resolving the attributes of every property with `spec_dict`, and
+with the previous implementation, which walked the rules, and the property
+with glom for every lookup; and reports the time to build all properties
+(sharing types, see `properties`).
+
+Usage::
+
+  python benchmarks/bench_spec_dict.py [--sizes 100 1000 10000 50000]
+
+"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+
+from glom import Coalesce, glom, Path as gPath
+
+from typedconfig.parsers.graph import properties, spec_dict
+from typedconfig.parsers.tree import is_node, path_if
+
+attr_rules = {
+    "name": {"type": "str"},
+    "costs": {f"cost{i}": {"type": "float", "optional": True} for i in range(5)},
+    **{f"attr{i}": {"type": "PositiveFloat", "optional": True} for i in range(20)},
+}
+
+
+class legacy_spec_dict(spec_dict):
+    def set_property(self, prop):
+        self.prop = prop
+        self.prop_paths = [p for p in path_if(prop, is_node) if p in self.attr_paths]
+        self._data = self.prop
+        self._paths = self.prop_paths
+        return self
+
+    def reset_property(self):
+        self.prop = self.prop_paths = None
+        self._data = self.attrs
+        self._paths = self.attr_paths
+
+    def __getitem__(self, path):
+        return glom(self._data, gPath(*path))
+
+    def __contains__(self, path):
+        return glom(self._data, (Coalesce(gPath(*path), default=False), bool))
+
+
+def make_props(nprops: int, nkinds: int = 10) -> dict:
+    """`nprops` properties, with `nkinds` distinct sets of attributes"""
+    props = {}
+    for i in range(nprops):
+        kind = i % nkinds
+        attrs = {f"attr{j}": 1.0 + j for j in range(20) if (kind >> j % 4) & 1}
+        costs = {f"cost{j}": float(j) for j in range(kind % 5)}
+        props[f"prop{i}"] = {"name": f"prop{i}", "costs": costs, **attrs}
+    return props
+
+
+def lookups(spec_t, props: dict) -> float:
+    """Time to resolve the attributes, and values of every property"""
+    start = perf_counter()
+    spec = spec_t(attr_rules)
+    for prop in props.values():
+        conf = spec.with_property(prop)
+        {str(path[-1]): spec[path] for path in conf}
+        {path[-1]: conf[path] for path in conf if path in conf}
+    return perf_counter() - start
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 50_000]
+    )
+    args = parser.parse_args()
+
+    print(f"{'props':>8} {'legacy':>10} {'spec_dict':>10} {'properties':>11}")
+    for size in args.sizes:
+        props = make_props(size)
+        legacy, index = lookups(legacy_spec_dict, props), lookups(spec_dict, props)
+        start = perf_counter()
+        properties(attr_rules, {}, props, type_namespace="bench", share_types=True)
+        total = perf_counter() - start
+        print(
+            f"{size:>8} {legacy * 1e3:>7.0f} ms {index * 1e3:>7.0f} ms "
+            f"{total * 1e3:>8.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark building the config type from a large ruleset
+
+Compares the compiled rules tree (`compile_rules` + `build_type`) with the
+previous implementation, which walks the rules dictionary repeatedly with
+boltons/glom, and rewrites every node in place (reproduced here, as it is no
+longer part of the package).
+
+Usage::
+
+  python benchmarks/bench_tree.py [--leaves 10000] [--repeat 3]
+
+"""
+
+from argparse import ArgumentParser
+from copy import deepcopy
+from functools import reduce
+from time import perf_counter
+
+from glom import Assign, glom, Invoke, Path as gPath, Spec
+
+from typedconfig.parsers import _ConfigIO
+from typedconfig.parsers.tree import (
+    compile_rules,
+    get_config_t,
+    is_leaf,
+    is_node,
+    leaf_subset,
+    path_if,
+    spec_to_type,
+    str_to_spec,
+)
+
+_leaf_types = [
+    {"type": "int", "default": 1},
+    {"type": "PositiveFloat"},
+    {"type": "Literal", "opts": ["foo", "bar"]},
+    {"type": "conint", "opts": {"gt": 0, "le": 10}},
+    {"type": "str", "optional": True},
+]
+
+
+def make_rules(nleaves: int, width: int = 10) -> dict:
+    """Ruleset with `nleaves` leaves in sections 3 levels deep"""
+    rules: dict = {}
+    for i in range(nleaves):
+        section = rules.setdefault(f"s{i // width ** 2}", {})
+        subsection = section.setdefault(f"ss{i // width % width}", {})
+        subsection[f"leaf{i % width}"] = dict(_leaf_types[i % len(_leaf_types)])
+    return rules
+
+
+def nested_type(key: str, value: dict) -> dict:
+    """Replace a section by its type, the validators are parsed first"""
+    return {"validator": str_to_spec(key, value), "type": spec_to_type(key, value)}
+
+
+def bind_updater(func):
+    """Reduce function that replaces the node at a path by `func(key, node)`"""
+
+    def update_inplace(conf: dict, path: tuple) -> dict:
+        glom_spec = gPath(*path)
+        _config_t = Spec(Invoke(func).constants(path[-1]).specs(glom_spec))
+        return glom(conf, Assign(glom_spec, _config_t))
+
+    return update_inplace
+
+
+def legacy_get_config_t(rules: dict):
+    """The traversal based implementation, before compiling rules"""
+    paths = path_if(rules, is_node)
+    leaves = path_if(rules, is_leaf)
+    conf = reduce(bind_updater(str_to_spec), leaves, deepcopy(rules))
+    branches = leaf_subset(paths - leaves)
+    while branches:
+        conf = reduce(bind_updater(nested_type), branches, conf)
+        branches = leaf_subset(path[:-1] for path in branches if path[:-1])
+    return spec_to_type("config", conf, bases=(_ConfigIO,))
+
+
+def timeit(func, *args, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        func(*args)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--leaves", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rules = make_rules(args.leaves)
+    results = {
+        "compile rules": timeit(compile_rules, rules, repeat=args.repeat),
+        "legacy": timeit(legacy_get_config_t, rules, repeat=args.repeat),
+        "compiled": timeit(
+            lambda r: get_config_t(r, cache=False), rules, repeat=args.repeat
+        ),
+    }
+    print(f"{args.leaves} leaves, best of {args.repeat}")
+    for name, secs in results.items():
+        print(f"{name:>16}: {secs * 1000:10.1f} ms")
+    print(f"{'speedup':>16}: {results['legacy'] / results['compiled']:10.2f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark reading, and writing YAML files with both PyYAML backends
+
+Generates config files of increasing size, and reports the throughput (MB/s)
+of `read_yaml`, and `to_yaml` with the libyaml bindings, and the pure Python
+implementation (see `typedconfig.helpers.use_libyaml`).
+
+Usage::
+
+  python benchmarks/bench_yaml.py [--sizes 1 4] [--repeat 3]
+
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+import yaml
+
+from typedconfig import helpers
+
+
+def make_conf(nbytes: int) -> dict:
+    """Nested config, similar to a model config, of about `nbytes` as YAML"""
+    conf: dict = {}
+    i = 0
+    while len(yaml.dump(conf, Dumper=helpers._yaml_dumper())) < nbytes:
+        for i in range(i, i + 500):
+            tech = conf.setdefault(f"tech{i // 50}", {"name": f"Technology {i}"})
+            tech[f"param{i % 50}"] = {
+                "value": i * 0.5,
+                "enabled": bool(i % 2),
+                "carriers": ["power", "heat"],
+            }
+        i += 1
+    return conf
+
+
+def throughput(func, nbytes: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        best = min(best, perf_counter() - start)
+    return nbytes / best / 2**20
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not yaml.__with_libyaml__:
+        print("PyYAML is not built with libyaml, only the pure backend is available")
+    backends = [False, True] if yaml.__with_libyaml__ else [False]
+    print(f"{'size':>8} {'backend':>8} {'read':>10} {'write':>10}")
+    with TemporaryDirectory() as tmpdir:
+        for size in args.sizes:
+            conf = make_conf(int(size * 2**20))
+            fpath = Path(tmpdir) / "conf.yaml"
+            helpers.to_yaml(conf, fpath)
+            nbytes = fpath.stat().st_size
+            for use_libyaml in backends:
+                helpers.use_libyaml = use_libyaml
+                read = throughput(lambda: helpers.read_yaml(fpath), nbytes, args.repeat)
+                write = throughput(
+                    lambda: helpers.to_yaml(conf, fpath), nbytes, args.repeat
+                )
+                print(
+                    f"{nbytes / 2**20:>5.1f} MB {'libyaml' if use_libyaml else 'pure':>8}"
+                    f" {read:>5.2f} MB/s {write:>5.2f} MB/s"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+from dataclasses import fields, is_dataclass
+import re
+
+import pytest
+import yaml
+
+from typedconfig.parsers.codegen import (
+    compile_module,
+    generate,
+    import_path,
+    load_config_t,
+)
+from typedconfig.parsers.tree import get_config_t
+
+rules = {
+    "validator": "sum_by_name",
+    "validator_params": {"total": 15},
+    "root_validator": True,
+    "first": {"type": "PositiveInt"},
+    "second": {
+        "type": "PositiveInt",
+        "validator": ["threshold", "mult_of"],
+        "validator_params": [{"threshold": 15}, {"factor": 5}],
+    },
+    "run": {
+        "mode": {"type": "Literal", "opts": ["plan", "operate"], "default": "plan"},
+        "eff": {"type": "confloat", "opts": {"gt": 0, "le": 1}},
+        "solver": {"type": "Dict", "opts": ["str", "int"], "default": {"foo": 1}},
+        "nest": {"leaf": {"type": "List", "opts": ["int"]}},
+    },
+    "maybe": {"type": "str", "optional": True},
+}
+
+
+def signature(config_t):
+    def _repr(_type):
+        # constrained types are created in the module where they are used
+        return re.sub(r"<class '[\w.]+\.(\w+)'>", r"\1", repr(_type))
+
+    return [
+        (f.name, signature(f.type) if is_dataclass(f.type) else _repr(f.type))
+        for f in fields(config_t)
+    ]
+
+
+@pytest.fixture
+def module_path(tmp_path):
+    rules_path = tmp_path / "rules.yaml"
+    rules_path.write_text(yaml.dump(rules, sort_keys=False))
+    return compile_module(rules_path, tmp_path / "rules_t.py")
+
+
+def test_generate(module_path):
+    module = import_path(module_path)
+    config_t = module.config_t
+
+    runtime_t = get_config_t({k: v for k, v in rules.items() if k != "maybe"})
+    assert signature(config_t)[:-1] == signature(runtime_t)
+    assert signature(config_t)[-1] == ("maybe", "typing.Optional[str]")
+
+    conf = {"first": 5, "second": 10, "run": {"eff": 0.5, "nest": {"leaf": [1]}}}
+    config = config_t(**conf)
+    assert config.run.mode == "plan"
+    assert config.run.solver == {"foo": 1}
+    assert config.maybe is None
+
+    with pytest.raises(ValueError, match="do not add up"):
+        config_t(**{**conf, "first": 1})
+    with pytest.raises(ValueError, match="not a multiple"):
+        config_t(**{**conf, "first": 3, "second": 12})
+    with pytest.raises(ValueError):
+        config_t(**{**conf, "run": {"eff": 2, "nest": {"leaf": [1]}}})
+
+
+def test_load_config_t(module_path):
+    rules_path = module_path.parent / "rules.yaml"
+    config_t = load_config_t(module_path, rules_path)
+    assert config_t.__name__ == "config_t"
+    source = module_path.read_text()
+
+    # stale module is regenerated
+    rules_path.write_text(yaml.dump({**rules, "third": {"type": "int"}}))
+    config_t = load_config_t(module_path, rules_path)
+    assert module_path.read_text() != source
+    assert "third" in config_t.__dataclass_fields__
+
+    # the module is not checked without rules
+    module_path.write_text(source)
+    assert "third" not in load_config_t(module_path).__dataclass_fields__
+
+    # a stale module is not imported, it might not import anymore
+    module_path.write_text(source + "\nraise ImportError\n")
+    config_t = load_config_t(module_path, rules_path)
+    assert "third" in config_t.__dataclass_fields__
+
+
+def test_generate_names(tmp_path):
+    _rules = {
+        "a": {"b__c": {"x": {"type": "int"}}},
+        "a__b": {"c": {"y": {"type": "int"}}},
+        "config": {"z": {"type": "int"}},
+    }
+    module_path = tmp_path / "names_t.py"
+    module_path.write_text(generate(_rules))
+    config_t = import_path(module_path).config_t
+    config = config_t(a={"b__c": {"x": 1}}, a__b={"c": {"y": 2}}, config={"z": 3})
+    assert (config.a.b__c.x, config.a__b.c.y, config.config.z) == (1, 2, 3)
+
+
+def test_generate_unsupported():
+    with pytest.raises(ValueError, match="cannot be represented"):
+        generate({"foo": {"type": "int", "default": object()}})
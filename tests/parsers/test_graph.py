@@ -1,8 +1,9 @@
 from pathlib import Path
+import pickle
 
 import pytest
 
-from typedconfig.helpers import read_yaml, NS
+from typedconfig.helpers import read_json, read_yaml, NS
 
 
 @pytest.mark.skip(reason="validators not defined")
@@ -42,3 +43,194 @@ def test_properties():
 
     props = properties(rules, {}, conf)
     assert props
+
+
+def test_properties_pickle():
+    from typedconfig.factory import _recipes
+    from typedconfig.parsers.graph import properties
+
+    rules = {
+        "name": {"type": "str"},
+        "eff": {"type": "confloat", "opts": {"gt": 0, "lt": 1}, "optional": True},
+    }
+    conf = {"foo": {"name": "Foo"}, "bar": {"parent": "foo", "name": "Bar", "eff": 0.5}}
+    props = properties(rules, {}, conf, type_namespace="pickled")
+    assert callable(type(props["bar"]).__typedconfig_recipe__)  # not computed yet
+    bar = pickle.loads(pickle.dumps(props["bar"]))
+    assert type(bar) is type(props["bar"]) and bar == props["bar"]
+
+    data = pickle.dumps(props["bar"])
+    _recipes.clear()
+    bar = pickle.loads(data)  # rebuilt
+    assert type(bar) is not type(props["bar"]) and bar.eff == 0.5
+    assert type(bar).__mro__[1].__name__ == "foo_t"
+
+
+def test_properties_share_types():
+    from pydantic import ValidationError
+
+    from typedconfig.parsers.graph import properties
+
+    rules = {
+        "name": {"type": "str"},
+        "eff": {"type": "confloat", "opts": {"gt": 0, "lt": 1}, "optional": True},
+    }
+    conf = {
+        "foo": {"name": "Foo"},
+        "bar": {"name": "Bar"},
+        "baz": {"name": "Baz", "eff": 0.5},
+        "qux": {"parent": "bar", "name": "Qux"},
+    }
+    props = properties(rules, {}, conf, share_types=True)
+    foo_t, bar_t, baz_t, qux_t = (type(props[k]) for k in ("foo", "bar", "baz", "qux"))
+    assert foo_t is not bar_t and foo_t.__bases__ == bar_t.__bases__  # shared
+    assert baz_t.__bases__ != foo_t.__bases__
+    assert issubclass(qux_t, bar_t)
+    assert props["bar"].name == "Bar" and props["qux"].name == "Qux"
+    from typedconfig._dynamic import bar_t as registered
+
+    assert registered is bar_t
+
+    # ancestry is the same as without sharing
+    assert qux_t.inherits_from(["bar"]) and not qux_t.inherits_from(["foo"])
+    assert not foo_t.inherits_from(["bar"])
+    with pytest.raises(ValidationError, match="bar_t"):
+        bar_t(name=["Bar"])
+
+    bar = pickle.loads(pickle.dumps(props["bar"]))
+    assert type(bar) is bar_t and bar == props["bar"]
+
+    props = properties(rules, {}, conf)
+    assert type(props["foo"]).__bases__ == (props["baseprop"],)  # not shared
+
+
+def test_spec_dict():
+    from typedconfig.parsers.graph import spec_dict
+
+    rules = {
+        "name": {"type": "str"},
+        "costs": {"om": {"type": "float"}, "capex": {"type": "float"}},
+        "tags": {"type": "List", "opts": ["str"], "optional": True},
+    }
+    spec = spec_dict(rules)
+    assert spec[("costs", "om")] is spec.attrs["costs"]["om"]
+    assert spec[("tags", "opts", 0)] == "str"  # list item, not indexed
+
+    conf = spec.with_property({"name": "", "costs": {"om": 0.5}, "extra": 1})
+    assert sorted(conf) == [("costs", "om"), ("name",)]
+    assert conf[("costs", "om")] == 0.5
+    assert ("costs", "om") in conf
+    assert ("name",) not in conf  # falsy values are not contained
+    assert ("costs", "capex") not in conf
+    assert spec.prop is None and ("name",) in spec
+
+
+def test_properties_field_order():
+    from dataclasses import fields
+
+    from pydantic import ValidationError
+
+    from typedconfig.parsers.graph import properties
+
+    # the validator on hi reads lo, which must come first, like in the rules
+    rules = {
+        "limits": {"lo": {"type": "float"}},
+        "bounds": {
+            "hi": {
+                "type": "float",
+                "validator": "range_check",
+                "validator_params": {"min_key": "lo"},
+            }
+        },
+    }
+    props = properties(
+        rules, {}, {"foo": {"limits": {"lo": 1.0}, "bounds": {"hi": 3.0}}}
+    )
+    assert [f.name for f in fields(props["foo"])] == ["lo", "hi"]
+
+    bad = {"foo": {"limits": {"lo": 5.0}, "bounds": {"hi": 3.0}}}
+    with pytest.raises(ValidationError, match="lo: 5.0 > 3.0"):
+        properties(rules, {}, bad, type_namespace="field_order")
+
+
+def test_properties_inherit():
+    from typedconfig.parsers.graph import properties
+
+    rules = {
+        "name": {"type": "str"},
+        "costs": {"type": "Dict"},
+        "eff": {"type": "float", "optional": True},
+    }
+    conf = {
+        "foo": {"name": "Foo", "costs": {"om": {"value": 1}}, "eff": 0.1},
+        "bar": {"parent": "foo", "name": "Bar"},
+        "baz": {"parent": "bar", "name": "Baz", "eff": 0.5},
+    }
+    props = properties(rules, {}, conf, type_namespace="inherit")
+    assert props["baz"].costs == props["foo"].costs
+    assert props["baz"].costs["om"] is props["foo"].costs["om"]  # not copied
+    assert (props["bar"].eff, props["baz"].eff) == (0.1, 0.5)
+
+
+def test_property_overlay(tmp_path):
+    from dataclasses import asdict, replace
+
+    from pydantic import ValidationError
+
+    from typedconfig.parsers.graph import nodes, properties, PropertyOverlay
+
+    rules = {
+        "name": {"type": "str"},
+        "costs": {"type": "Dict"},
+        "eff": {"type": "confloat", "opts": {"gt": 0, "lt": 1}, "optional": True},
+    }
+    conf = {"foo": {"name": "Foo", "costs": {"om": 1}, "eff": 0.2}}
+    props = properties(rules, {}, conf, type_namespace="overlay")
+    foo = props["foo"]
+
+    overlay = PropertyOverlay(foo, eff="0.5")  # validated
+    assert overlay.eff == 0.5 and overlay.costs is foo.costs
+    assert isinstance(overlay, type(foo))
+    assert overlay == replace(foo, eff=0.5) and replace(foo, eff=0.5) == overlay
+    assert asdict(overlay) == {**asdict(foo), "eff": 0.5}
+    assert overlay.to_dict() == replace(foo, eff=0.5).to_dict()
+    overlay.to_json(tmp_path / "overlay.json")
+    assert read_json(tmp_path / "overlay.json")["eff"] == 0.5
+    assert pickle.loads(pickle.dumps(overlay)) == overlay
+    assert PropertyOverlay(overlay, name="Bar")._base is foo
+
+    with pytest.raises(ValidationError):
+        PropertyOverlay(foo, eff=2)
+    with pytest.raises(TypeError):
+        PropertyOverlay(foo, bar=1)
+
+    _nodes = {
+        "n1": {"lat": 1.0, "techs": {"foo": {"eff": 0.3}}},
+        "n2": {"lat": 2.0, "techs": {"foo": None}},
+    }
+    res = nodes({"lat": {"type": "float"}}, props, _nodes)
+    assert type(res["n1"].techs["foo"]) is PropertyOverlay
+    assert res["n1"].techs["foo"].eff == 0.3 and res["n2"].techs["foo"] is foo
+
+
+def test_property_overlay_validators():
+    from dataclasses import replace
+
+    from pydantic import ValidationError
+
+    from typedconfig.parsers.graph import properties, PropertyOverlay
+
+    rules = {
+        "lo": {"type": "float"},
+        "hi": {
+            "type": "float",
+            "validator": "range_check",
+            "validator_params": {"min_key": "lo"},
+        },
+    }
+    props = properties(rules, {}, {"foo": {"lo": 1.0, "hi": 10.0}})
+    # the validator on hi reads lo, so it is run again
+    for override in (replace, PropertyOverlay):
+        with pytest.raises(ValidationError, match="lo: 100.0 > 10.0"):
+            override(props["foo"], lo=100.0)
+    assert PropertyOverlay(props["foo"], lo=5.0).lo == 5.0
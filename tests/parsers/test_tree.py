@@ -1,5 +1,10 @@
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from dataclasses import asdict
 from inspect import getclosurevars
+from multiprocessing import get_context
 from pathlib import Path
+import pickle
 import platform
 import shutil
 
@@ -21,10 +26,19 @@ from typedconfig.parsers.tree import (
     get_validator,
     str_to_spec,
     spec_to_type,
+    compile_rules,
+    prune_optional,
+    build_type,
     get_config_t,
+    config_t_cache,
     resolve_optional,
     get_config,
+    IncrementalBuilder,
+    type_cache,
 )
+from typedconfig.factory import nested_types
+from typedconfig.helpers import NS
+from typedconfig.parsers import _ConfigIO
 
 
 def test_path_if():
@@ -117,6 +131,10 @@ def test_leaf_subset():
     }
     assert result == expected
 
+    # repeated keys in a path
+    paths = [("k1",), ("k1", "k2"), ("k1", "k2", "k1"), ("k2", "k1")]
+    assert leaf_subset(paths) == {("k1", "k2", "k1"), ("k2", "k1")}
+
 
 def test_type_getter():
     spec = {"type": "Literal", "opts": ["foo", "bar"]}
@@ -144,6 +162,27 @@ def test_type_getter():
         assert get_type(spec) == expected
 
 
+def test_type_cache():
+    spec = {"type": "conint", "opts": {"gt": 0, "le": 10}}
+    c_int = get_type(spec)
+    assert get_type({"type": "conint", "opts": {"le": 10, "gt": 0}}) is c_int
+    assert get_type({"type": "conint", "opts": {"gt": 0, "le": 11}}) is not c_int
+    assert get_type({"type": "confloat", "opts": spec["opts"]}) is not c_int
+    # positional options are ordered
+    literal = get_type({"type": "Literal", "opts": ["foo", "bar"]})
+    assert get_type({"type": "Literal", "opts": ["foo", "bar"]}) is literal
+    assert get_type({"type": "Literal", "opts": ["bar", "foo"]}) is not literal
+
+    # ambiguous options still warn every time
+    for _ in range(2):
+        with pytest.warns(UserWarning, match="ambiguous option ignored.+"):
+            get_type({"type": "PositiveInt", "opts": "foo"})
+
+    NS.reset()
+    assert len(type_cache) == 0
+    assert get_type(spec) is not c_int
+
+
 def test_validator_getter():
     # TODO: test all variations
     spec = {
@@ -271,6 +310,104 @@ def test_spec_parsing_nested():
         config_t(top=dict(first=5, second=10, nest={"leaf": 13}))
 
 
+def test_compile_rules():
+    rules = {
+        "validator": "zero_sum",
+        "validator_params": {"total": 15},
+        "root_validator": True,
+        "foo": {"type": "int", "default": 0, "doc": "foo"},
+        "parent": {
+            "child": {"type": "bool", "optional": True},
+            "cousin": {"type": "Literal", "opts": ["abc", "xyz"]},
+        },
+        "bla": "not a node",
+    }
+    root = compile_rules(rules)
+    assert root.kind == "branch" and root.path == ()
+    assert root.validator == {
+        "validator": "zero_sum",
+        "validator_params": {"total": 15},
+        "root_validator": True,
+    }
+    assert list(root.children) == ["foo", "parent"]
+
+    foo = root.children["foo"]
+    assert foo.is_leaf and foo.path == ("foo",)
+    assert (foo.type, foo.default, foo.optional) == ("int", 0, False)
+
+    parent = root.children["parent"]
+    assert parent.kind == "branch" and not parent.validator
+    assert parent.children["child"].optional
+    cousin = parent.children["cousin"]
+    assert cousin.spec() == {"type": "Literal", "opts": ["abc", "xyz"]}
+
+    branches = [node.path for node in root.bottom_up()]
+    assert branches == [("parent",), ()]
+
+    paths = [node.path for node in root.walk()]
+    assert paths == [
+        (),
+        ("foo",),
+        ("parent",),
+        ("parent", "child"),
+        ("parent", "cousin"),
+    ]
+
+
+def test_prune_optional():
+    rules = {
+        "foo": {"type": "int", "optional": True},
+        "parent": {"child": {"type": "bool", "optional": True}},
+        "other": {"child": {"type": "bool"}},
+    }
+    root = compile_rules(rules)
+
+    # nothing to prune, the tree is reused
+    conf = {"foo": 1, "parent": {"child": True}, "other": {"child": False}}
+    assert prune_optional(root, conf) is root
+
+    pruned = prune_optional(root, {"other": {"child": False}})
+    assert list(pruned.children) == ["parent", "other"]
+    assert pruned.children["parent"].children == {}
+    assert pruned.children["other"] is root.children["other"]
+    # original tree is unchanged
+    assert list(root.children["parent"].children) == ["child"]
+
+
+def test_build_type_repeated_keys():
+    rules = {
+        "k1": {"k2": {"k1": {"leaf": {"type": "int"}}}},
+        "k2": {"k1": {"leaf": {"type": "str", "default": "foo"}}},
+    }
+    config_t = get_config_t(rules)
+    config = config_t(k1={"k2": {"k1": {"leaf": 1}}}, k2={"k1": {}})
+    assert config.k1.k2.k1.leaf == 1
+    assert config.k2.k1.leaf == "foo"
+
+
+def test_build_type_validators():
+    # key validators on a section, and root validators on a leaf are ignored
+    rules = {
+        "top": {
+            "validator": "threshold",
+            "validator_params": {"threshold": 1},
+            "leaf": {"type": "int"},
+            "other": {
+                "type": "int",
+                "validator": "zero_sum",
+                "validator_params": {"total": 0},
+                "root_validator": True,
+            },
+        }
+    }
+    config_t = get_config_t(rules)
+    conf = config_t(top={"leaf": 5, "other": 5})
+    assert (conf.top.leaf, conf.top.other) == (5, 5)
+
+    with pytest.raises(ValueError, match="top level validators"):
+        build_type(compile_rules({"validator": "zero_sum", **rules}))
+
+
 # not a unit test, more of an integration test
 @pytest.mark.skipif(
     platform.system() != "Linux", reason="FIXME: Test setup is Linux specific"
@@ -334,3 +471,123 @@ def test_optional():
     assert config.parent.child == False
     assert config.parent.cousin == True
     assert config.array2 == [-3, 3]
+
+
+def test_config_t_cache():
+    rules = {
+        "foo": {"type": "int", "default": 0},
+        "parent": {"child": {"type": "bool"}},
+    }
+    config_t_cache.clear()
+    config_t = get_config_t(rules)
+    assert config_t_cache.info().misses == 1
+
+    # identical rules, built independently
+    assert get_config_t(remap(rules)) is config_t
+    assert config_t_cache.info().hits == 1
+
+    # different rules, or caching disabled
+    assert get_config_t({**rules, "bar": {"type": "str"}}) is not config_t
+    assert get_config_t(rules, cache=False) is not config_t
+
+    # cache is invalidated when the namespaces are reset
+    NS.reset()
+    assert len(config_t_cache) == 0
+    assert get_config_t(rules) is not config_t
+
+
+def test_config_t_pickle():
+    rules = {
+        "foo": {"type": "int", "default": 0},
+        "parent": {"child": {"type": "Path"}},
+    }
+    config_t = get_config_t(rules)
+    config = config_t(parent={"child": "/tmp"})
+    assert pickle.loads(pickle.dumps(config_t)) is config_t
+    res = pickle.loads(pickle.dumps(config))
+    assert type(res) is config_t and type(res.parent) is type(config.parent)
+
+    # rebuilt from the rules in a new process
+    with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+        assert pool.submit(asdict, config).result() == asdict(config)
+
+
+def test_config_t_nested_instances():
+    rules = {
+        "foo": {"type": "int", "default": 0},
+        "parent": {"child": {"type": "int"}, "other": {"type": "int", "default": 1}},
+    }
+    config_t = get_config_t(rules)
+    parent_t = config_t.__dataclass_fields__["parent"].type
+    assert config_t._nested_fields() == (("parent", parent_t),)
+    assert "__nested_fields__" in config_t.__dict__
+
+    config = config_t(parent={"child": 2})
+    assert config.parent == parent_t(child=2, other=1)
+
+    # instances are used as is
+    parent = parent_t(child=3)
+    assert config_t(parent=parent).parent is parent
+
+
+def test_incremental_builder():
+    rules = {
+        "foo": {"type": "int", "default": 0},
+        "a": {"b": {"c": {"type": "int"}}, "d": {"e": {"type": "str"}}},
+        "f": {"g": {"type": "float"}},
+    }
+    builder = IncrementalBuilder()
+    config_t = builder.build(rules)
+    before = dict(nested_types(config_t))
+    assert builder.build(rules) is config_t
+
+    rules["a"]["b"]["c"]["validator"] = "threshold"  # type: ignore
+    rules["a"]["b"]["c"]["validator_params"] = {"threshold": 10}  # type: ignore
+    config_t = builder.build(rules)
+    after = dict(nested_types(config_t))
+    # the changed section, and its ancestors are rebuilt
+    changed = {(), ("a",), ("a", "b")}
+    assert all(after[path] is not before[path] for path in changed)
+    assert all(after[path] is before[path] for path in set(after) - changed)
+
+    conf = {"a": {"b": {"c": 1}, "d": {"e": "x"}}, "f": {"g": 1.0}}
+    assert asdict(config_t(**conf)) == asdict(get_config_t(rules)(**conf))
+    conf["a"]["b"]["c"] = 11
+    with pytest.raises(ValueError, match="above threshold"):
+        config_t(**conf)
+    assert pickle.loads(pickle.dumps(config_t)) is config_t
+
+
+def test_build_type_shared():
+    costs = {"capex": {"type": "float"}, "opex": {"type": "float", "default": 0.0}}
+    rules = {
+        "tech1": {"costs": costs, "name": {"type": "str"}},
+        "tech2": {"costs": deepcopy(costs), "name": {"type": "str"}},
+        "tech3": {"costs": {**costs, "opex": {"type": "float"}}},
+        "storage": {"other_costs": deepcopy(costs)},
+    }
+    types = dict(nested_types(build_type(compile_rules(rules))))
+    costs_t = types[("tech1", "costs")]
+    assert types[("tech2", "costs")] is costs_t
+    assert types[("storage", "other_costs")] is costs_t
+    assert types[("tech1",)] is types[("tech2",)]  # identical parents as well
+    assert types[("tech3", "costs")] is not costs_t  # different default
+
+    conf = {"capex": 1, "opex": 2}
+    config = types[()](
+        tech1={"costs": conf, "name": "a"},
+        tech2={"costs": {"capex": 3}, "name": "b"},
+        tech3={"costs": conf},
+        storage={"other_costs": conf},
+    )
+    assert config.tech1.costs == config.storage.other_costs == costs_t(**conf)
+    assert config.tech2.costs.opex == 0.0
+    # named after all the sections sharing the type
+    assert costs_t.__name__ == "costs|other_costs_t"
+    assert types[("tech3", "costs")].__name__ == "costs_t"
+
+    section = {"x": {"type": "int"}, "y": {"type": "int"}}
+    rules = {"s": section, "t": deepcopy(section)}
+    config_t = build_type(compile_rules(rules), bases=(_ConfigIO,))
+    with pytest.raises(ValueError, match=r"for s\|t_t"):
+        config_t(s={"x": 1, "y": 2}, t={"x": 1, "y": "nan?"})
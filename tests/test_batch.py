@@ -0,0 +1,49 @@
+from dataclasses import asdict
+
+import pytest
+
+from typedconfig.batch import validate_many
+from typedconfig.helpers import to_yaml
+from typedconfig.parsers.tree import get_config
+
+rules = {
+    "foo": {"type": "int"},
+    "bar": {
+        "baz": {"type": "Path"},
+        "qux": {"type": "str", "optional": True},
+    },
+}
+
+
+@pytest.fixture
+def conf_paths(tmp_path):
+    to_yaml(rules, tmp_path / "rules.yaml")
+    paths = []
+    for i in range(12):
+        conf = {"foo": i if i % 4 else "nan", "bar": {"baz": f"/tmp/{i}"}}
+        if i % 3:
+            conf["bar"]["qux"] = "quux"
+        paths.append(tmp_path / f"conf{i}.yaml")
+        to_yaml(conf, paths[-1])
+    return paths
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_validate_many(tmp_path, conf_paths, workers):
+    results = dict(validate_many(rules, conf_paths, workers=workers, window=3))
+    assert set(results) == set(conf_paths)
+
+    for i, path in enumerate(conf_paths):
+        if i % 4:
+            expected = get_config(tmp_path / "rules.yaml", path)
+            assert asdict(results[path]) == asdict(expected)
+            assert hasattr(results[path].bar, "qux") == bool(i % 3)
+        else:
+            (err,) = results[path]
+            assert err["loc"] == ("foo",) and err["type"] == "type_error.integer"
+
+
+def test_validate_many_errors(tmp_path, conf_paths):
+    missing = tmp_path / "missing.yaml"
+    results = dict(validate_many(tmp_path / "rules.yaml", [missing], workers=0))
+    assert results[missing][0]["type"] == "FileNotFoundError"
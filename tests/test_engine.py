@@ -0,0 +1,131 @@
+from pathlib import Path
+
+import pytest
+
+from typedconfig.engine import _compile, _FAIL, compile_validator
+from typedconfig.helpers import to_yaml
+from typedconfig.parsers.tree import get_config, get_config_t
+
+rules = {
+    "flag": {"type": "bool", "default": True},
+    "count": {
+        "type": "int",
+        "validator": "threshold",
+        "validator_params": {"threshold": 10},
+    },
+    "ratio": {"type": "float"},
+    "name": {"type": "str", "default": "foo"},
+    "out": {"type": "Path"},
+    "mode": {"type": "Literal", "opts": ["plan", "operate"], "default": "plan"},
+    "limits": {
+        "lo": {"type": "conint", "opts": {"gt": -5, "multiple_of": 2}},
+        "hi": {"type": "PositiveFloat", "default": 1.0},
+        "nested": {"items": {"type": "List", "opts": ["int"], "default": []}},
+    },
+    "axes": {
+        "root_validator": True,
+        "validator": "zero_sum",
+        "validator_params": {"total": 0},
+        "x": {"type": "int"},
+        "y": {"type": "int"},
+    },
+}
+
+conf = {
+    "count": 3,
+    "ratio": 2,
+    "out": "/tmp/out.log",
+    "limits": {"lo": 4, "nested": {"items": [1, "2"]}},
+    "axes": {"x": 1, "y": -1},
+}
+
+
+def _error(func, data):
+    with pytest.raises(Exception) as err:
+        func(data)
+    return type(err.value), str(err.value)
+
+
+def test_compile_validator():
+    config_t = get_config_t(rules)
+    validate = compile_validator(config_t)
+
+    assert _compile(config_t)(conf) is not _FAIL
+    config = validate(conf)
+    assert config == config_t(**conf)
+    assert isinstance(config.ratio, float) and isinstance(config.out, Path)
+    assert config.limits.nested.items == [1, 2]  # not compiled, pydantic field
+    assert config.__pydantic_initialised__
+
+
+@pytest.mark.parametrize(
+    "update",
+    [
+        {"count": 11},  # field validator
+        {"count": "3"},  # coerced by pydantic
+        {"flag": "yes"},
+        {"mode": "foo"},
+        {"limits": {"lo": -6}},
+        {"limits": {"lo": 3}},
+        {"limits": {"lo": 4, "hi": 0}},
+        {"axes": {"x": 1, "y": 1}},  # root validator
+        {"extra": 1},
+    ],
+)
+def test_fallback(update):
+    config_t = get_config_t(rules)
+    validate = compile_validator(config_t)
+    data = {**conf, **update}
+
+    try:
+        expected = config_t(**data)
+    except Exception:
+        assert _error(validate, data) == _error(lambda d: config_t(**d), data)
+    else:
+        assert validate(data) == expected
+
+
+@pytest.mark.parametrize(
+    "opts", [{"gt": 0}, {"lt": 10}, {"allow_inf_nan": True}, {"allow_inf_nan": False}]
+)
+@pytest.mark.parametrize("value", [1.5, float("nan"), float("inf"), float("-inf")])
+def test_constrained_float(opts, value):
+    config_t = get_config_t({"x": {"type": "confloat", "opts": opts}})
+    validate = compile_validator(config_t)
+
+    try:
+        expected = config_t(x=value)
+    except Exception:
+        assert _error(validate, {"x": value}) == _error(
+            lambda d: config_t(**d), {"x": value}
+        )
+    else:
+        assert repr(validate({"x": value}).x) == repr(expected.x)  # nan != nan
+
+
+def test_compiled_types_collected():
+    import gc
+    import weakref
+
+    from typedconfig.parsers import _ConfigIO
+    from typedconfig.parsers.tree import spec_to_type
+
+    spec = {"x": {"type": "int"}, "sub": {"y": {"type": "float"}}}
+    refs = []
+    for i in range(3):
+        config_t = spec_to_type(f"gc{i}", spec, bases=(_ConfigIO,))
+        compile_validator(config_t)({"x": 1, "sub": {"y": 2}})
+        refs.append(weakref.ref(config_t))
+        del config_t
+    gc.collect()
+    assert all(ref() is None for ref in refs)
+
+
+def test_get_config_engine(tmp_path):
+    to_yaml(rules, tmp_path / "rules.yaml")
+    to_yaml(conf, tmp_path / "conf.yaml")
+    files = (tmp_path / "rules.yaml", tmp_path / "conf.yaml")
+    assert get_config(*files, engine="fast") == get_config(*files)
+
+    with pytest.raises(ValueError, match="unknown validation engine"):
+        get_config(*files, engine="foo")
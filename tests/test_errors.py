@@ -0,0 +1,62 @@
+import pytest
+
+from typedconfig.errors import collect_errors, ConfigError, ConfigValidationError
+from typedconfig.helpers import to_yaml
+from typedconfig.parsers.tree import get_config, get_config_t
+
+rules = {
+    "foo": {"type": "int"},
+    "bar": {
+        "baz": {"type": "PositiveInt", "default": 1},
+        "qux": {"type": "Literal", "opts": ["a", "b"]},
+        "deep": {"x": {"type": "float"}, "y": {"type": "str"}},
+    },
+    "axes": {
+        "root_validator": True,
+        "validator": "zero_sum",
+        "validator_params": {"total": 0},
+        "x": {"type": "int"},
+        "y": {"type": "int"},
+    },
+}
+
+
+def test_collect_errors():
+    config_t = get_config_t(rules)
+    valid = {"foo": 1, "bar": {"qux": "a", "deep": {"x": 1, "y": "z"}}}
+    assert collect_errors(config_t, {**valid, "axes": {"x": 1, "y": -1}}) == []
+
+    conf = {
+        "foo": "one",
+        "bar": {"baz": -1, "qux": "c", "deep": {"x": "nan?", "z": 0}},
+        "axes": {"x": 1, "y": 1},
+    }
+    errors = collect_errors(config_t, conf)
+    assert [(err.loc, err.type) for err in errors] == [
+        ("bar.deep.z", "value_error.extra"),
+        ("bar.deep.x", "type_error.float"),
+        ("bar.deep.y", "value_error.missing"),
+        ("bar.qux", "value_error.const"),
+        ("bar.baz", "value_error.number.not_gt"),
+        ("axes.__root__", "value_error"),
+        ("foo", "type_error.integer"),
+    ]
+
+
+def test_get_config_fail_fast(tmp_path):
+    conf = {"foo": "one", "bar": {"qux": "c", "deep": {"x": 1}}, "axes": {}}
+    to_yaml(rules, tmp_path / "rules.yaml")
+    to_yaml(conf, tmp_path / "conf.yaml")
+    files = (tmp_path / "rules.yaml", tmp_path / "conf.yaml")
+
+    # the first nested section fails
+    with pytest.raises(TypeError):
+        get_config(*files)
+
+    for engine in ("pydantic", "fast"):
+        with pytest.raises(ConfigValidationError) as err:
+            get_config(*files, engine=engine, fail_fast=False)
+        locs = [e.loc for e in err.value.errors]
+        assert locs == ["axes.x", "axes.y", "bar.deep.y", "bar.qux", "foo"]
+        assert str(err.value).startswith("5 validation errors\naxes.x\n")
+        assert isinstance(err.value.errors[0], ConfigError)
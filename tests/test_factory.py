@@ -1,13 +1,15 @@
 from inspect import getclosurevars
 from dataclasses import field
+import pickle
 from typing import Any, Dict
 
-from pydantic import confloat, PositiveInt, validator, ValidationError
+from pydantic import confloat, conint, PositiveInt, validator, ValidationError
 from pydantic.dataclasses import dataclass as pydantic_dataclass
 import pytest
 from typing_extensions import Literal  # in 3.8, 'from typing'
 
-from typedconfig.factory import make_typedconfig, make_validator
+from typedconfig.factory import _recipes, make_typedconfig, make_validator, set_recipe
+from typedconfig.factory import validator_cache
 
 
 # standard dataclass
@@ -203,3 +205,70 @@ def test_make_validator():
     assert hasattr(root_validator, "__root_validator_config__")
 
     # TODO: test options
+
+
+def test_make_validator_cache():
+    def threshold(cls, val, values, *, threshold):
+        if val > threshold:
+            raise ValueError(f"above threshold: {val} > {threshold}")
+        return val
+
+    validator_cache.clear()
+    (method,) = make_validator(threshold, "foo", threshold=1).values()
+    assert make_validator(threshold, "foo", threshold=1)["threshold"] is method
+    # different key, parameter value or type, or options
+    for key, params, opts in [
+        ("bar", {"threshold": 1}, {}),
+        ("foo", {"threshold": 2}, {}),
+        ("foo", {"threshold": 1.0}, {}),
+        ("foo", {"threshold": 1}, {"pre": True}),
+    ]:
+        assert (
+            make_validator(threshold, key, opts=opts, **params)["threshold"]
+            is not method
+        )
+    assert validator_cache.info().hits == 1
+    assert validator_cache.info().currsize == 5
+
+    # unhashable parameters are not cached
+    validator_cache.clear()
+    make_validator(threshold, "foo", threshold=1, extra=bytearray(b"x"))
+    assert validator_cache.info().currsize == 0
+
+    # the same validator is shared by types
+    range_ts = [
+        make_typedconfig(
+            f"T{i}",
+            [("foo", int)],
+            namespace=make_validator(threshold, "foo", threshold=1),
+        )
+        for i in range(2)
+    ]
+    for range_t in range_ts:
+        assert range_t(foo=1).foo == 1
+        with pytest.raises(ValidationError, match="above threshold"):
+            range_t(foo=2)
+
+
+def make_range_t(maximum: int):
+    range_t = make_typedconfig("range_t", [("min", conint(le=maximum))])
+    return set_recipe(range_t, make_range_t, ("range", maximum), (maximum,))
+
+
+def test_pickle_recipe():
+    range_t = make_range_t(10)
+    assert pickle.loads(pickle.dumps(range_t)) is range_t
+
+    rng = range_t(min=5)
+    res = pickle.loads(pickle.dumps(rng))
+    assert type(res) is range_t and res == rng
+
+    # rebuilt when the type is missing (e.g. in another process)
+    data = pickle.dumps(rng)
+    _recipes.clear()
+    res = pickle.loads(data)
+    assert type(res) is not range_t and res.min == 5
+    assert type(res).__typedconfig_recipe__[1:] == (("range", 10), (10,), ())
+
+    with pytest.raises(pickle.PicklingError):
+        pickle.dumps(RunConfig_t)  # no recipe
@@ -1,10 +1,20 @@
+from copy import deepcopy
 from io import StringIO
+import json
+import pickle
+import sys
+import time
+from types import SimpleNamespace
+from typing import List
 
 import pytest
 import yaml
 
-from typedconfig.helpers import _Names, merge_dicts, merge_rules
-from typedconfig.parsers.tree import get_config_t
+from typedconfig import helpers
+from typedconfig.helpers import _Names, LRUCache, merge_dicts, merge_into, merge_rules
+from typedconfig.helpers import DocumentCache, freeze, thaw, read_yaml, to_yaml
+from typedconfig.helpers import LayeredMapping
+from typedconfig.parsers.tree import get_config, get_config_t
 
 
 def test_nonexistent_module():
@@ -39,6 +49,32 @@ def test_nonconformant_module():
         NS.types
 
 
+def test_lazy_import(tmp_path, monkeypatch):
+    (tmp_path / "lazy_types.py").write_text(
+        "from pydantic import conint\n__all__ = ['Percent']\nPercent = conint(ge=0, le=100)\n"
+    )
+    (tmp_path / "dynamic_types.py").write_text(
+        "from pydantic import PositiveInt\n__all__ = ['Count']\n__all__ += ['Size']\n"
+        "Count = Size = PositiveInt\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    NS = _Names()
+    NS._type_modules = [*NS._default_type_modules, "lazy_types", "dynamic_types"]
+    assert isinstance(NS.types, SimpleNamespace)  # names are indexed
+    assert "lazy_types" not in sys.modules
+    assert "dynamic_types" in sys.modules  # __all__ is not a literal
+
+    assert NS.types["List"] is List and NS.types.get("Size") is not None
+    assert "lazy_types" not in sys.modules
+    assert NS.types["Percent"].le == 100
+    assert "lazy_types" in sys.modules
+
+    with pytest.raises(RuntimeError, match="has no type 'Nope'"):
+        NS.types["Nope"]
+    assert NS.types.get("Nope", 1) == 1
+    assert not hasattr(NS.types, "Nope")
+
+
 def test_reload():
     NS = _Names()
     # all default modules loaded
@@ -51,6 +87,15 @@ def test_reload():
     assert not hasattr(NS.types, "PositiveInt")
 
 
+def test_reset_caches():
+    NS = _Names()
+    cache = NS.add_cache(LRUCache(maxsize=4))
+    cache["foo"] = "bar"
+    NS.add_modules("type", ["pydantic.types"])
+    assert "foo" not in cache
+    NS._caches.remove(cache)
+
+
 def test_set_confdir():
     NS = _Names()
     spec = {"path": {"type": "ConfFilePath"}}
@@ -90,3 +135,141 @@ def test_merge():
     # check order
     assert list(result) == list(expected)
     assert list(result["b"]) == list(expected["b"])
+
+
+@pytest.mark.parametrize(
+    "confs",
+    [
+        [{"a": {"b": 1}}, {"a": {"c": 2}}, {"a": {"b": 3, "d": {"e": 4}}}],
+        [{"a": 1, "b": {"c": 2}}, {"b": None}, {"b": {"d": 3}, "e": [5]}],
+    ],
+)
+def test_merge_into(confs):
+    expected = merge_dicts(confs)
+    snapshot = deepcopy(confs)
+    acc: dict = {}
+    for conf in confs:
+        acc = merge_into(acc, conf)
+    assert acc == expected
+    assert json.dumps(acc) == json.dumps(expected)  # same key order
+    assert confs == snapshot  # inputs are not modified
+
+
+def test_lru_cache_getsize():
+    cache = LRUCache(maxsize=10, getsize=len)
+    cache["a"] = "x" * 4
+    cache["b"] = "x" * 4
+    cache["a"] = "x" * 5  # replaced
+    assert cache.info().currsize == 9
+    cache["c"] = "x" * 3  # evicts "b", the least recently used
+    assert "b" not in cache and cache.info().currsize == 8
+    assert cache.pop("a") == "x" * 5 and cache.info().currsize == 3
+
+
+def test_frozen():
+    doc = freeze({"a": [1, {"b": 2}], "c": {"d": [3]}})
+    assert isinstance(doc, dict) and doc == {"a": [1, {"b": 2}], "c": {"d": [3]}}
+    for mutate in (
+        lambda: doc.update(x=1),
+        lambda: doc["c"].pop("d"),
+        lambda: doc["a"].append(1),
+        lambda: doc["a"][1].__setitem__("b", 3),
+    ):
+        with pytest.raises(TypeError, match="immutable"):
+            mutate()
+
+    for copied in (thaw(doc), deepcopy(doc)):
+        copied["c"]["d"].append(4)
+        assert type(copied["a"][1]) is dict and doc["c"]["d"] == [3]
+    assert pickle.loads(pickle.dumps(doc)) == doc
+
+
+def test_document_cache(tmp_path):
+    fpaths = [tmp_path / "d1.yaml", tmp_path / "d2.yaml"]
+    to_yaml({"a": 1, "b": {"c": 3}}, fpaths[0])
+    to_yaml({"b": {"d": 4}}, fpaths[1])
+    cache = DocumentCache()
+
+    result = merge_rules(fpaths, read_yaml, cache=cache)
+    assert result == {"a": 1, "b": {"c": 3, "d": 4}}
+    assert cache.info().misses == 2 and cache.info().currsize > 0
+
+    # callers can modify the result without affecting the cache
+    del result["b"]
+    assert merge_rules(fpaths, read_yaml, cache=cache)["b"] == {"c": 3, "d": 4}
+    assert merge_rules(fpaths[0], read_yaml, cache=cache) == {"a": 1, "b": {"c": 3}}
+    assert cache.info().hits == 3
+
+    # modified files are read again, and replace the stale document
+    to_yaml({"b": {"d": 40, "e": 5}}, fpaths[1])
+    assert merge_rules(fpaths, read_yaml, cache=cache)["b"]["d"] == 40
+    assert len(cache.docs) == 2
+
+    # the index of the latest version of the files is bounded
+    cache = DocumentCache(maxfiles=1)
+    assert merge_rules(fpaths, read_yaml, cache=cache)["b"]["d"] == 40
+    assert len(cache._keys) == 1 and len(cache.docs) == 2
+
+
+@pytest.mark.skipif(not yaml.__with_libyaml__, reason="PyYAML without libyaml")
+def test_yaml_backends(tmp_path, monkeypatch):
+    conf = {"a": 1.5, "b": {"c": [1, "two", None], "d": "word " * 30}, "e": True}
+    escaped = {"f": "é " * 50}  # long escaped strings are folded differently
+    results = []
+    for use_libyaml in (False, True):
+        monkeypatch.setattr(helpers, "use_libyaml", use_libyaml)
+        fpaths = tmp_path / f"{use_libyaml}.yaml", tmp_path / f"{use_libyaml}e.yaml"
+        to_yaml(conf, fpaths[0])
+        to_yaml(escaped, fpaths[1])
+        results.append((fpaths[0].read_text(), *map(read_yaml, fpaths)))
+    assert results[0] == results[1]
+    assert results[0][1:] == (conf, escaped)
+
+
+def test_merge_max_workers():
+    confs = [{"a": i, "b": {f"c{i}": i, "d": i}} for i in range(8)]
+
+    def reader(i: int):
+        time.sleep(0.01 * (8 - i))  # later files are read first
+        return confs[i]
+
+    expected = merge_rules(list(range(8)), reader)
+    result = merge_rules(list(range(8)), reader, max_workers=4)
+    assert result == expected
+    assert result["a"] == result["b"]["d"] == 7
+    assert list(result["b"]) == list(expected["b"])
+
+
+def test_layered_mapping(tmp_path):
+    layers = [
+        {"a": 1, "b": {"c": 3, "d": 4}, "e": True},
+        {"c": 3, "b": {"e": 5, "d": 40}, "e": {"g": True, "h": "foo"}},
+        {"b": {"f": [6]}},
+    ]
+    fpaths = [tmp_path / f"conf{i}.yaml" for i in range(len(layers))]
+    for layer, fpath in zip(layers, fpaths):
+        to_yaml(layer, fpath)
+    view = LayeredMapping.from_files(fpaths, read_yaml)
+    assert isinstance(view, LayeredMapping)
+    expected = merge_dicts(layers)
+    assert list(view) == list(expected) and len(view) == len(expected)
+    assert list(view["b"]) == list(expected["b"]) and view["b"]["d"] == 40
+    assert view["e"] == expected["e"] and "c" in view and "z" not in view
+    assert view["b"] is view["b"]  # nested views are reused
+    with pytest.raises(TypeError):
+        view["a"] = 2  # type: ignore
+
+    conf = view.materialise()
+    assert json.dumps(conf) == json.dumps(expected)  # same key order
+    conf["b"]["f"].append(7)  # independent of the layers
+    assert view["b"]["f"] == [6]
+
+    # used in place of files, the view is materialised
+    assert merge_rules(view["b"], read_yaml) == expected["b"]
+    cache = DocumentCache()
+    view = LayeredMapping.from_files(fpaths, read_yaml, cache=cache)
+    assert view.layers[0] is cache.read(fpaths[0], read_yaml)
+    rules = {key: {"type": "int"} for key in "cde"}
+    to_yaml({**rules, "f": {"type": "List"}}, tmp_path / "rules.yaml")
+    config = get_config(tmp_path / "rules.yaml", view["b"])
+    assert config.d == 40 and config.f == [6]  # type: ignore
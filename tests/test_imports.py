@@ -0,0 +1,19 @@
+import subprocess
+import sys
+
+import pytest
+
+heavy = {"boltons", "glom", "networkx", "yaml"}
+
+
+@pytest.mark.parametrize(
+    "module", ["typedconfig.parsers.tree", "typedconfig.parsers.graph"]
+)
+def test_deferred_imports(module):
+    # in a new interpreter, as the test session has imported everything
+    code = f"import sys, {module}; print(*sorted(sys.modules))"
+    proc = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    roots = {name.split(".")[0] for name in proc.stdout.split()}
+    assert not roots & heavy
@@ -0,0 +1,77 @@
+from threading import Event
+import time
+
+import pytest
+
+from typedconfig.helpers import to_yaml
+from typedconfig.watch import watch, Watcher
+
+rules = {
+    "foo": {"type": "int"},
+    "bar": {"baz": {"type": "str"}, "qux": {"type": "PositiveInt", "default": 1}},
+    "quux": {"corge": {"type": "float"}},
+}
+conf = {"foo": 1, "bar": {"baz": "x"}, "quux": {"corge": 1.5}}
+
+
+@pytest.fixture
+def files(tmp_path):
+    to_yaml(rules, tmp_path / "rules.yaml")
+    to_yaml(conf, tmp_path / "conf.yaml")
+    to_yaml({}, tmp_path / "local.yaml")
+    return tmp_path / "rules.yaml", [tmp_path / "conf.yaml", tmp_path / "local.yaml"]
+
+
+def touch(path, obj):
+    to_yaml(obj, path)
+    time.sleep(0.01)  # let the modification time change
+
+
+@pytest.mark.parametrize("engine", ["pydantic", "fast"])
+def test_check(files, engine):
+    results: list = []
+    watcher = Watcher(*files, lambda *res: results.append(res), engine=engine)
+    config, errors = watcher.check()
+    assert results == [(config, [])] and config.bar.qux == 1
+
+    touch(files[1][1], {"bar": {"qux": 2}})
+    _config, errors = watcher.check()
+    assert not errors and _config.bar.qux == 2 and _config.bar is not config.bar
+    assert _config.quux is config.quux  # unchanged section, not validated again
+
+    touch(files[1][1], {"bar": {"qux": -1}, "quux": {"corge": "nan?"}})
+    _config, errors = watcher.check()
+    assert _config is None
+    assert [err.loc for err in errors] == ["bar.qux", "quux.corge"]
+
+    # the rules change, the type of the unchanged section is reused
+    touch(files[1][1], {})
+    touch(files[0], {**rules, "foo": {"type": "float"}})
+    _config, errors = watcher.check()
+    assert not errors and isinstance(_config.foo, float)
+    assert type(_config.bar) is type(config.bar) and _config.bar == config.bar
+
+    files[1][0].write_text("foo: [")
+    _config, errors = watcher.check()
+    assert _config is None and errors[0].loc == "" and "Error" in errors[0].type
+
+
+@pytest.mark.parametrize("poll", [False, True])
+def test_watch(files, poll):
+    results: list = []
+    changed = Event()
+
+    def callback(config, errors):
+        results.append((config, errors))
+        changed.set()
+
+    watcher = watch(*files, callback, poll=poll, interval=0.02)
+    try:
+        assert changed.wait(5)
+        changed.clear()
+        touch(files[1][1], {"foo": 2})
+        assert changed.wait(5)
+    finally:
+        watcher.stop()
+    config, errors = results[-1]
+    assert not errors and config.foo == 2
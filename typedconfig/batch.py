@@ -0,0 +1,237 @@
+"""Validate many config files against the same rules
+
+`get_config` reads, and merges the rules, and builds the config type for
+every config.  When validating a large number of configs against the same
+rules, `validate_many` compiles the rules once, and validates the config
+files in a pool of worker processes:
+
+>>> for path, res in validate_many("rules.yaml", paths, workers=4):  # doctest: +SKIP
+...     if isinstance(res, list):
+...         print(path, res)  # errors
+
+Every worker receives the rules once when it starts, and then only the
+paths of the config files.  The results are yielded in the order they
+complete, and only a bounded number of configs are in flight at any time.
+
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from copy import deepcopy
+from dataclasses import is_dataclass
+from functools import reduce
+from itertools import islice
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
+
+from pydantic import ValidationError
+
+from typedconfig.engine import compile_validator
+from typedconfig.factory import nested_types, set_recipe
+from typedconfig.helpers import fingerprint, LRUCache, merge_rules, NS, read_yaml
+from typedconfig.parsers import _ConfigIO, _fpaths
+from typedconfig.parsers.tree import _path_t, build_type, compile_rules
+from typedconfig.parsers.tree import prune_optional
+
+_key_t = Tuple[bool, ...]  # which optional leaves are present in a config
+_result_t = Union[Any, List[Dict]]
+
+
+def _present(conf: Any, path: _path_t) -> bool:
+    for key in path:
+        if not isinstance(conf, dict) or key not in conf:
+            return False
+        conf = conf[key]
+    return True
+
+
+def _errors(err: Exception) -> List[Dict]:
+    """Errors in the same format as `pydantic.ValidationError.errors()`"""
+    if isinstance(err, ValidationError):
+        return [dict(error) for error in err.errors()]
+    return [{"loc": (), "msg": str(err), "type": type(err).__name__}]
+
+
+def _dump(obj) -> Dict:
+    """Validated values of a config instance, as nested dictionaries"""
+    return {
+        key: _dump(val) if is_dataclass(val) else val
+        for key, val in obj.__dict__.items()
+        if key != "__pydantic_initialised__"
+    }
+
+
+def _construct(cls: Type, values: Dict):
+    """Instantiate a config type from validated values, without validation"""
+    for name, field in cls.__pydantic_model__.__fields__.items():
+        tp: Type = field.type_
+        if is_dataclass(tp) and isinstance(values[name], dict):
+            values[name] = _construct(tp, values[name])
+    obj = object.__new__(cls)
+    obj.__dict__.update(values)
+    obj.__dict__["__pydantic_initialised__"] = True
+    return obj
+
+
+class _Validator:
+    """Validate configs against rules that are compiled once
+
+    The config type depends on which optional keys are present in a config,
+    so the types are cached by the optional leaves that are present.  The
+    types are stamped with a recipe, so they can be pickled.
+
+    """
+
+    def __init__(self, rules: Dict, engine: str = "pydantic"):
+        if engine not in ("pydantic", "fast"):
+            raise ValueError(f"{engine!r}: unknown validation engine")
+        self.engine = engine
+        self.rules = deepcopy(rules)
+        self.fingerprint = (fingerprint(rules), NS.modules)
+        self.root = compile_rules(rules)
+        self.optional = [
+            node.path for node in self.root.walk() if node.is_leaf and node.optional
+        ]
+        self.types = LRUCache(maxsize=32)
+        _validators[self.fingerprint] = self
+
+    def key(self, conf: Dict) -> _key_t:
+        return tuple(_present(conf, path) for path in self.optional)
+
+    def config_t(self, key: _key_t) -> Type:
+        config_t = self.types.get(key)
+        if config_t is not None:
+            return config_t
+        # a config with only the optional leaves that are present
+        conf: Dict = {}
+        for path, present in zip(self.optional, key):
+            if present:
+                reduce(lambda d, k: d.setdefault(k, {}), path, conf)
+        pruned = prune_optional(self.root, conf)
+        config_t = self.types[key] = build_type(pruned, "config", bases=(_ConfigIO,))
+        for path, _type in nested_types(config_t):
+            recipe_key = (*self.fingerprint, key)
+            set_recipe(_type, _config_t, recipe_key, (self.rules, key), path)
+        return config_t
+
+    def validate(self, conf_files: _fpaths) -> Tuple[_key_t, Any]:
+        """Validate a config, and return the type key, and the instance"""
+        conf = merge_rules(conf_files, read_yaml)
+        key = self.key(conf)
+        config_t = self.config_t(key)
+        if self.engine == "fast":
+            return key, compile_validator(config_t)(conf)
+        return key, config_t(**conf)
+
+    def __call__(self, conf_files: _fpaths) -> _result_t:
+        try:
+            return self.validate(conf_files)[1]
+        except Exception as err:
+            return _errors(err)
+
+
+# validators by the fingerprint of the rules (and namespace modules)
+_validators = NS.add_cache(LRUCache(maxsize=8))
+
+
+def _config_t(rules: Dict, key: _key_t) -> Type:
+    """Config type for rules, and optional leaves present (recipe builder)"""
+    validator = _validators.get((fingerprint(rules), NS.modules))
+    if validator is None:
+        validator = _Validator(rules)
+    return validator.config_t(key)
+
+
+# validator in a worker process, created on start-up by `_init_worker`
+_worker: Optional[_Validator] = None
+
+
+def _init_worker(rules: Dict, modules: Tuple, engine: str):
+    global _worker
+    if NS.modules != modules:
+        NS._type_modules, NS._validator_modules = map(list, modules)
+        NS.reset()
+    _worker = _Validator(rules, engine)
+
+
+def _validate_in_worker(conf_files: _fpaths) -> Tuple[bool, Any]:
+    """Validate a config in a worker; returns the type key, and values or errors
+
+    Pickling a config instance includes the recipe of its type, and the recipe
+    includes the rules.  Instead, only the validated values are sent back, and
+    the instance is constructed again (without validation) in the parent
+    process.
+
+    """
+    try:
+        key, conf = _worker.validate(conf_files)  # type: ignore
+    except Exception as err:
+        return False, _errors(err)
+    return True, (key, _dump(conf))
+
+
+def validate_many(
+    rules: Union[Dict, _fpaths],
+    conf_paths: Iterable[_fpaths],
+    workers: Optional[int] = None,
+    *,
+    window: Optional[int] = None,
+    engine: str = "pydantic",
+) -> Iterator[Tuple[_fpaths, _result_t]]:
+    """Validate many configs against the same rules
+
+    Parameters
+    ----------
+    rules : Dict | Path | List[Path]
+        Rules dictionary, or rules files (merged like in `get_config`)
+    conf_paths : Iterable[Path | List[Path]]
+        Config files; an item can also be a list of files that are merged
+    workers : int (optional)
+        Number of worker processes, defaults to the number of CPUs.  With 0,
+        configs are validated serially in the current process.
+    window : int (optional)
+        Maximum number of configs in flight, defaults to twice the number of
+        workers
+    engine : str (default: "pydantic")
+        Validation engine, see `get_config`
+
+    Yields
+    ------
+    Tuple[Path | List[Path], Config | List[Dict]]
+        The config files, and the config object; or if validation failed, a
+        list of errors (like `pydantic.ValidationError.errors()`).  Results
+        are yielded in the order they complete.
+
+    """
+    if not isinstance(rules, dict):
+        rules = merge_rules(rules, read_yaml)
+    validator = _Validator(rules, engine)
+
+    if workers == 0:
+        for conf_files in conf_paths:
+            yield conf_files, validator(conf_files)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    window = window or 2 * workers
+    conf_paths = iter(conf_paths)
+    pending: Dict[Future, _fpaths] = {}
+    with ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(rules, NS.modules, engine)
+    ) as pool:
+        try:
+            for conf_files in islice(conf_paths, window):
+                pending[pool.submit(_validate_in_worker, conf_files)] = conf_files
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    conf_files = pending.pop(future)
+                    for _next in islice(conf_paths, 1):
+                        pending[pool.submit(_validate_in_worker, _next)] = _next
+                    ok, res = future.result()
+                    if ok:
+                        key, values = res
+                        res = _construct(validator.config_t(key), values)
+                    yield conf_files, res
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,300 @@
+"""Fast validation of config values
+
+Instantiating a config type validates every value through pydantic: each
+field goes through the generic validator machinery, and the nested types are
+instantiated one by one by `_ConfigIO.__post_init__`.  For the common leaf
+types this is a lot of overhead for what amounts to an `isinstance` check.
+
+This module compiles a config type into a flat Python function (one per
+nested type) that checks, and coerces each leaf inline, and calls the
+validator functions directly.  It handles the builtin types (`bool`, `int`,
+`float`, `str`, `Path`), `Literal`, and the constrained numeric types
+(`conint`, `confloat`, `PositiveInt`, etc); any other field is validated by
+its pydantic field.
+
+>>> validate = compile_validator(config_t)  # doctest: +SKIP
+>>> conf = validate({"foo": 1, "bar": {"baz": "qux"}})  # doctest: +SKIP
+
+The fast path only accepts valid values.  When a value does not pass (or
+cannot be checked) inline, the config is validated again by instantiating
+the config type, so that errors are identical to pydantic's.
+
+"""
+
+from dataclasses import fields, is_dataclass, MISSING
+from inspect import getclosurevars, signature
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from pydantic.fields import ModelField, SHAPE_SINGLETON
+from pydantic.types import ConstrainedFloat, ConstrainedInt
+from pydantic.typing import all_literal_values, is_literal_type
+from pydantic.utils import almost_equal_floats
+
+from typedconfig.parsers import _ConfigIO
+
+# sentinels: value did not pass the inline checks, key not in the input
+_FAIL = object()
+_MISSING = object()
+
+# exceptions pydantic converts to validation errors
+_validation_exc = (ValueError, TypeError, AssertionError)
+
+
+def _direct_call(func: Callable, args: str, ns: Dict[str, Any], name: str) -> str:
+    """Call expression for a validator function
+
+    Validators created by `make_validator` are closures that forward to the
+    validator function with the bound parameters, the function is called
+    directly instead.
+
+    """
+    nonlocals = getclosurevars(func).nonlocals
+    if callable(nonlocals.get("func")) and isinstance(nonlocals.get("params"), dict):
+        ns[f"{name}_f"], ns[f"{name}_p"] = nonlocals["func"], nonlocals["params"]
+        return f"{name}_f({args}, **{name}_p)"
+    ns[name] = func
+    return f"{name}({args})"
+
+
+def _npositional(func: Callable) -> int:
+    try:
+        params = signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return -1
+    if any(p.kind not in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in params):
+        return -1
+    return len(params)
+
+
+class _Compiler:
+    """Generate the source of the validation function for a config type"""
+
+    def __init__(self, cls: Type):
+        self.cls = cls
+        self.model = cls.__pydantic_model__
+        self.config = self.model.__config__
+        self.ns: Dict[str, Any] = {
+            "_cls": cls,
+            "_FAIL": _FAIL,
+            "_MISSING": _MISSING,
+            "_new": object.__new__,
+            "_Path": Path,
+            "_almost_equal": almost_equal_floats,
+        }
+
+    def compilable(self) -> bool:
+        """Whether the type can be validated by a compiled function"""
+        # other bases might customise initialisation
+        return (
+            set(self.cls.__mro__[1:]) <= set(_ConfigIO.__mro__)
+            and not hasattr(self.cls, "__post_init_post_parse__")
+            and not self.model.__pre_root_validators__
+        )
+
+    def leaf_checks(self, field: ModelField, i: int) -> Optional[List[str]]:
+        """Inline checks (and coercion) of `v` for a leaf, None if unsupported"""
+        tp, config = field.type_, self.config
+        if tp is bool:
+            return ["if v is not True and v is not False:", "    return _FAIL"]
+        if tp is int:
+            return ["if type(v) is not int:", "    return _FAIL"]
+        if tp is float and config.allow_inf_nan:
+            return [
+                "if type(v) is not float:",
+                "    if type(v) is not int:",
+                "        return _FAIL",
+                "    v = float(v)",
+            ]
+        if tp is str and not (
+            config.anystr_strip_whitespace
+            or config.anystr_upper
+            or config.anystr_lower
+            or config.min_anystr_length
+            or config.max_anystr_length
+        ):
+            return ["if type(v) is not str:", "    return _FAIL"]
+        if tp is Path:
+            return [
+                "if not isinstance(v, _Path):",
+                "    if type(v) is not str:",
+                "        return _FAIL",
+                "    v = _Path(v)",
+            ]
+        if is_literal_type(tp):
+            self.ns[f"_lit{i}"] = {v: v for v in all_literal_values(tp)}
+            return [f"v = _lit{i}.get(v, _FAIL)", "if v is _FAIL:", "    return _FAIL"]
+        if isinstance(tp, type) and issubclass(tp, ConstrainedInt):
+            return ["if type(v) is not int:", "    return _FAIL"] + self.constraints(
+                tp, i
+            )
+        if isinstance(tp, type) and issubclass(tp, ConstrainedFloat):
+            # an explicit False on the type overrides the model config
+            allow_inf_nan = getattr(tp, "allow_inf_nan", None)
+            if allow_inf_nan is None:
+                allow_inf_nan = config.allow_inf_nan
+            if not allow_inf_nan:
+                return None
+            if tp.strict:
+                lines = ["if type(v) is not float:", "    return _FAIL"]
+            else:
+                lines = [
+                    "if type(v) is not float:",
+                    "    if type(v) is not int:",
+                    "        return _FAIL",
+                    "    v = float(v)",
+                ]
+            return lines + self.constraints(tp, i)
+        return None
+
+    def constraints(self, tp: Type, i: int) -> List[str]:
+        """Checks mirroring `number_size_validator` & `number_multiple_validator`"""
+        lines = []
+        for op, attr in ((">", "gt"), (">=", "ge"), ("<", "lt"), ("<=", "le")):
+            # like pydantic, `ge` is ignored when `gt` is set
+            if getattr(tp, attr) is None or (attr == "ge" and tp.gt is not None):
+                continue
+            self.ns[f"_{attr}{i}"] = getattr(tp, attr)
+            lines += [f"if not v {op} _{attr}{i}:", "    return _FAIL"]
+        if tp.multiple_of is not None:
+            self.ns[f"_mult{i}"] = float(tp.multiple_of)
+            lines += [
+                f"_mod = float(v) / _mult{i} % 1",
+                "if not _almost_equal(_mod, 0.0) and not _almost_equal(_mod, 1.0):",
+                "    return _FAIL",
+            ]
+        return lines
+
+    def post_validators(self, field: ModelField, i: int) -> Optional[List[str]]:
+        """Direct calls to the field validators, None if unsupported"""
+        lines = []
+        for j, val in enumerate(field.class_validators.values()):
+            if val.pre or val.each_item or _npositional(val.func) != 3:
+                return None
+            call = _direct_call(val.func, "_cls, v, values", self.ns, f"_val{i}_{j}")
+            lines.append(f"v = {call}")
+        return lines
+
+    def field_lines(self, field: ModelField, i: int) -> List[str]:
+        """Validate `v` for a field"""
+        tp: Type = field.type_
+        if is_dataclass(tp) and hasattr(tp, "__pydantic_model__"):
+            self.ns[f"_c{i}"], self.ns[f"_n{i}"] = tp, _compile(tp)
+            lines = [
+                "if type(v) is dict:",
+                f"    v = _n{i}(v)",
+                "    if v is _FAIL:",
+                "        return _FAIL",
+                f"elif not isinstance(v, _c{i}):",  # instances are not validated again
+                "    return _FAIL",
+            ]
+        else:
+            lines = self.leaf_checks(field, i)  # type: ignore
+        validators = self.post_validators(field, i)
+        if (
+            lines is None
+            or validators is None
+            or field.shape != SHAPE_SINGLETON
+            or field.sub_fields
+            or field.field_info.const
+            or field.parse_json
+        ):
+            # validate with the pydantic field
+            self.ns[f"_field{i}"] = field
+            return [
+                f"v, _err = _field{i}.validate(v, values, loc={field.name!r}, cls=_cls)",
+                "if _err:",
+                "    return _FAIL",
+            ]
+        if field.allow_none:
+            lines = ["if v is not None:", *(f"    {line}" for line in lines)]
+        return lines + validators
+
+    def source(self) -> str:
+        """Source of the validation function"""
+        defaults = {f.name: f for f in fields(self.cls)}
+        self.ns["_keys"] = frozenset(defaults)
+        body = [
+            "if type(data) is not dict or not _keys.issuperset(data):",
+            "    return _FAIL",
+            "values = {}",
+        ]
+        for i, (name, field) in enumerate(self.model.__fields__.items()):
+            body.append(f"v = data.get({name!r}, _MISSING)")
+            dc_field = defaults[name]
+            if dc_field.default is not MISSING:
+                self.ns[f"_default{i}"] = dc_field.default
+                body += ["if v is _MISSING:", f"    v = _default{i}"]
+            elif dc_field.default_factory is not MISSING:  # type: ignore
+                self.ns[f"_factory{i}"] = dc_field.default_factory  # type: ignore
+                body += ["if v is _MISSING:", f"    v = _factory{i}()"]
+            else:
+                body += ["if v is _MISSING:", "    return _FAIL"]
+            body += self.field_lines(field, i)
+            body.append(f"values[{name!r}] = v")
+        for j, (_, val) in enumerate(self.model.__post_root_validators__):
+            if _npositional(val) == 2:
+                call = _direct_call(val, "_cls, values", self.ns, f"_root{j}")
+            else:
+                self.ns[f"_root{j}"] = val
+                call = f"_root{j}(_cls, values)"
+            body.append(f"values = {call}")
+        body += [
+            "obj = _new(_cls)",
+            "obj.__dict__.update(values)",
+            "obj.__dict__['__pydantic_initialised__'] = True",
+            "return obj",
+        ]
+        return "\n".join(["def validate(data):", *(f"    {line}" for line in body)])
+
+
+def _compile(cls: Type) -> Callable:
+    """Compile the validation function for a config type (memoised)
+
+    The function returns the config instance, or `_FAIL` if the values did
+    not pass the inline checks.  It is stored on the type, as it references
+    the type (a weak mapping keyed by the type would keep it alive).
+
+    """
+    try:
+        return cls.__dict__["__compiled_validator__"]
+    except KeyError:
+        pass
+    compiler = _Compiler(cls)
+    if compiler.compilable():
+        exec(compiler.source(), compiler.ns)
+        func = compiler.ns["validate"]
+    else:
+
+        def func(data):
+            return cls(**data)
+
+    cls.__compiled_validator__ = func  # type: ignore
+    return func
+
+
+def compile_validator(config_t: Type) -> Callable[[Dict], Any]:
+    """Compile a function that validates a config, and returns an instance
+
+    Parameters
+    ----------
+    config_t : Type
+        Config type (see `get_config_t`)
+
+    Returns
+    -------
+    Callable[[Dict], config_t]
+        Validation function; on invalid values it raises the same errors as
+        instantiating the config type
+
+    """
+    fast = _compile(config_t)
+
+    def validate(data: Dict):
+        try:
+            conf = fast(data)
+        except _validation_exc:
+            conf = _FAIL
+        return config_t(**data) if conf is _FAIL else conf
+
+    return validate
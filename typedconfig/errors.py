@@ -0,0 +1,118 @@
+"""Collect all validation errors in a config
+
+Instantiating a config type stops at the first nested section that fails:
+the nested sections are instantiated one by one before the config is
+validated (see `_ConfigIO.__post_init__`).  Instead, `collect_errors`
+validates every section independently, and reports all errors in the config
+with the dotted path to the offending key:
+
+>>> for err in collect_errors(config_t, conf):  # doctest: +SKIP
+...     print(err.loc, err.msg)
+run.mode unexpected value; permitted: 'plan', 'operate'
+run.solver.threads ensure this value is greater than 0
+
+"""
+
+from dataclasses import fields, is_dataclass, MISSING
+from typing import Dict, Iterator, List, NamedTuple, Tuple, Type
+
+from pydantic.main import validate_model
+
+
+class ConfigError(NamedTuple):
+    """A validation error
+
+    Attributes
+    ----------
+    loc : str
+        Dotted path to the key, e.g. "a.b.c"; errors from a root validator end
+        with "__root__"
+    type : str
+        Error type, as reported by pydantic, e.g. "type_error.integer"
+    msg : str
+        Error message
+
+    """
+
+    loc: str
+    type: str
+    msg: str
+
+    def __str__(self) -> str:
+        return f"{self.loc}\n  {self.msg} (type={self.type})"
+
+
+class ConfigValidationError(ValueError):
+    """All validation errors in a config"""
+
+    def __init__(self, errors: List[ConfigError]):
+        super().__init__(errors)
+        self.errors = errors
+
+    def __str__(self) -> str:
+        count = len(self.errors)
+        header = f"{count} validation error{'' if count == 1 else 's'}"
+        return "\n".join([header, *map(str, self.errors)])
+
+
+def _dotted(loc: Tuple) -> str:
+    return ".".join(map(str, loc))
+
+
+def _branch_errors(cls: Type, data: Dict, loc: Tuple) -> Iterator[ConfigError]:
+    model = cls.__pydantic_model__
+    _fields = {f.name: f for f in fields(cls)}
+    for key in data:
+        if key not in _fields:  # rejected by the dataclass __init__
+            yield ConfigError(
+                _dotted(loc + (key,)), "value_error.extra", "extra fields not permitted"
+            )
+
+    # like the dataclass __init__, defaults are included in the values
+    values = {}
+    for name, _field in _fields.items():
+        if name in data:
+            values[name] = data[name]
+        elif _field.default is not MISSING:
+            values[name] = _field.default
+        elif _field.default_factory is not MISSING:  # type: ignore
+            values[name] = _field.default_factory()  # type: ignore
+
+    # nested sections are validated independently, and skipped in the
+    # current section if they fail
+    invalid = set()
+    for name, field in model.__fields__.items():
+        tp: Type = field.type_
+        if isinstance(values.get(name), dict) and is_dataclass(tp):
+            nested = list(_branch_errors(tp, values[name], loc + (name,)))
+            if nested:
+                invalid.add(name)
+                del values[name]
+                yield from nested
+
+    *_, validation_error = validate_model(model, values, cls=cls)
+    if validation_error is None:
+        return
+    for err in validation_error.errors():
+        if err["loc"][0] in invalid and err["type"] == "value_error.missing":
+            continue
+        yield ConfigError(_dotted(loc + err["loc"]), err["type"], err["msg"])
+
+
+def collect_errors(config_t: Type, conf: Dict) -> List[ConfigError]:
+    """Validate every section of a config, and collect all errors
+
+    Parameters
+    ----------
+    config_t : Type
+        Config type
+    conf : Dict
+        Config dictionary
+
+    Returns
+    -------
+    List[ConfigError]
+        Validation errors, empty if the config is valid
+
+    """
+    return list(_branch_errors(config_t, conf, ()))
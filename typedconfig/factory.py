@@ -1,11 +1,123 @@
+from abc import ABCMeta
+import copyreg
 import keyword
+import pickle
 import types
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Hashable, Iterator, Tuple, Type
+from weakref import WeakValueDictionary
 
 from pydantic import root_validator, validator
 from pydantic.dataclasses import dataclass as pydantic_dataclass
 
+from typedconfig.helpers import hashable, LRUCache, NS
+
 _vmap_t = Dict[str, classmethod]
+_recipe_t = Tuple[Callable, Hashable, Tuple, Tuple[str, ...]]
+
+
+class TypedConfigMeta(ABCMeta):
+    """Metaclass of the types created by `make_typedconfig`
+
+    The types are created dynamically, so they cannot be pickled by reference
+    to their module.  Instead, a type can be stamped with a recipe to rebuild
+    it (see `set_recipe`), and is pickled by the recipe.  Instances are pickled
+    as usual (by their type, and attributes), so they are not validated again
+    when unpickled.
+
+    """
+
+
+# types with a recipe, keyed by the recipe key and the type path
+_recipes: "WeakValueDictionary[Tuple[Hashable, Tuple], Type]" = WeakValueDictionary()
+
+
+def set_recipe(
+    cls: Type, builder: Callable, key: Hashable, args: Tuple, path: Tuple = ()
+) -> Type:
+    """Stamp a type with a recipe to rebuild it in another process
+
+    Parameters
+    ----------
+    cls : Type
+        Type created by `make_typedconfig`
+    builder : Callable
+        Function that (re)builds the type, and stamps it with the same recipe.
+        It should be importable by name (like any pickled function).
+    key : Hashable
+        A key that uniquely identifies the builder inputs, e.g. a fingerprint
+    args : Tuple
+        Arguments for the builder, they should be picklable
+    path : Tuple (default: ())
+        Path to identify the type among the types stamped by the builder
+
+    Returns
+    -------
+    Type
+        The stamped type
+
+    """
+    cls.__typedconfig_recipe__ = (builder, key, args, path)
+    _recipes[(key, path)] = cls
+    return cls
+
+
+def set_lazy_recipe(cls: Type, stamp: Callable[[], None]) -> Type:
+    """Stamp a type with a recipe only when it is pickled
+
+    For builders whose recipe key is expensive to compute (e.g. a fingerprint
+    of large inputs).  Until then, the type cannot be found by its recipe in
+    the current process.
+
+    Parameters
+    ----------
+    cls : Type
+        Type created by `make_typedconfig`
+    stamp : Callable[[], None]
+        Called when the type is first pickled, it should stamp the type with
+        `set_recipe`
+
+    Returns
+    -------
+    Type
+        The type
+
+    """
+    cls.__typedconfig_recipe__ = stamp
+    return cls
+
+
+def nested_types(cls: Type, path: Tuple = ()) -> Iterator[Tuple[Tuple, Type]]:
+    """Iterate over a config type, and its nested types with their paths"""
+    yield path, cls
+    for name, field in cls.__pydantic_model__.__fields__.items():
+        if isinstance(field.type_, TypedConfigMeta):
+            yield from nested_types(field.type_, path + (name,))
+
+
+def from_recipe(builder: Callable, key: Hashable, args: Tuple, path: Tuple) -> Type:
+    """Get a type by its recipe, it is rebuilt if it does not exist"""
+    cls = _recipes.get((key, path))
+    if cls is None:
+        builder(*args)
+        cls = _recipes.get((key, path))
+    if cls is None:
+        raise pickle.UnpicklingError(
+            f"{path}: rebuilding with {builder.__qualname__} did not create the type"
+        )
+    return cls
+
+
+def _reduce_type(cls: Type):
+    recipe = cls.__dict__.get("__typedconfig_recipe__")
+    if callable(recipe):  # see set_lazy_recipe
+        recipe()
+        recipe = cls.__dict__.get("__typedconfig_recipe__")
+    if recipe is None:  # pickle by reference, e.g. a registered type
+        return cls.__qualname__
+    return from_recipe, recipe
+
+
+copyreg.pickle(TypedConfigMeta, _reduce_type)
 
 
 # copied and adapted make_dataclass(..) from cpython/Lib/dataclasses.py
@@ -29,6 +141,7 @@ def make_typedconfig(cls_name, fields, *, bases=(), namespace=None, **kwargs):
           y: int = field(init=False)
 
     For the bases and namespace parameters, see the builtin type() function.
+    The metaclass of the created type is `TypedConfigMeta`.
 
     The parameters init, repr, eq, order, unsafe_hash, and frozen are passed to
     pydantic_dataclass().
@@ -68,14 +181,28 @@ def make_typedconfig(cls_name, fields, *, bases=(), namespace=None, **kwargs):
     namespace["__annotations__"] = anns
     # We use `types.new_class()` instead of simply `type()` to allow dynamic
     # creation of generic dataclassses.
-    cls = types.new_class(cls_name, bases, {}, lambda ns: ns.update(namespace))
+    cls = types.new_class(
+        cls_name,
+        bases,
+        {"metaclass": TypedConfigMeta},
+        lambda ns: ns.update(namespace),
+    )
 
     return pydantic_dataclass(cls, **kwargs)
 
 
+# validator classmethods by the function, key, parameters, and options; the
+# reuse rate can be inspected with `validator_cache.info()`
+validator_cache = NS.add_cache(LRUCache(maxsize=4096))
+
+
 def make_validator(func: Callable, key: str, *, opts: Dict = {}, **params) -> _vmap_t:
     """Create a validator classmethod by wrapping a function in a closure
 
+    Validators are memoised on the function, key, parameters, and options
+    (see `validator_cache`); the same classmethod is reused by every type
+    with an identical validator.
+
     Parameters
     ----------
     func : Callable
@@ -101,6 +228,16 @@ def make_validator(func: Callable, key: str, *, opts: Dict = {}, **params) -> _v
           {'function_name' : classmethod(func)}
 
     """
+    try:
+        cache_key: Hashable = (func, key, hashable(params), hashable(opts))
+        hash(cache_key)
+    except TypeError:  # unhashable parameters, not cached
+        cache_key = None
+    if cache_key is not None:
+        cached = validator_cache.get(cache_key)
+        if cached is not None:
+            return {func.__name__: cached}
+
     # NOTE: cannot use functools.partial because pydantic does very restrictive
     # function signature checks.  The module and qualitative names are also
     # expected to be set.
@@ -141,4 +278,7 @@ def make_validator(func: Callable, key: str, *, opts: Dict = {}, **params) -> _v
     opts = {"allow_reuse": True, **opts}
 
     decorator = validator(key, **opts) if key else root_validator(**opts)
-    return {func.__name__: decorator(wrapper)}
+    method = decorator(wrapper)
+    if cache_key is not None:
+        validator_cache[cache_key] = method
+    return {func.__name__: method}
@@ -1,16 +1,26 @@
-from collections import Counter
+import ast
+from collections import namedtuple, OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import hashlib
 from importlib import import_module
-from itertools import chain
+from importlib.util import find_spec
 import json
 from pathlib import Path
 import re
+import sys
+from threading import RLock
 from types import SimpleNamespace
 from typing import (
     Any,
     Callable,
     Dict,
+    Hashable,
     Iterable,
+    Iterator,
     List,
+    Optional,
     Sequence,
     TextIO,
     Tuple,
@@ -18,8 +28,6 @@ from typing import (
     Union,
 )
 
-import yaml
-
 
 def import_from(module: str, name: str) -> Any:
     """Import `name` from `module`
@@ -33,17 +41,170 @@ def import_from(module: str, name: str) -> Any:
     return getattr(import_module(module), name)
 
 
+def fingerprint(obj: Any) -> str:
+    """Return a stable content hash of a nested data structure
+
+    The hash is computed from a JSON serialisation of `obj`, so it is stable
+    across processes and sessions.  The order of keys is significant, as it
+    determines the order of fields in the generated types.  Values that are
+    not JSON serialisable are represented by their `repr`.
+
+    >>> fingerprint({"a": 1, "b": [1, 2]}) == fingerprint({"a": 1, "b": [1, 2]})
+    True
+    >>> fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+    False
+
+    """
+    try:
+        data = json.dumps(obj, default=repr, separators=(",", ":"))
+    except (TypeError, ValueError):  # non-string keys, or circular references
+        data = repr(obj)
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+def hashable(obj: Any) -> Hashable:
+    """Hashable representation of nested dictionaries, lists, and sets
+
+    The type of every value is included, so that e.g. `1`, `1.0`, and `True`
+    are distinct.  Other values are used as is, so the result might still be
+    unhashable (e.g. a `bytearray`).
+
+    >>> hashable({"a": [1, 2]}) == hashable({"a": [1, 2]})
+    True
+    >>> hashable({"a": 1}) == hashable({"a": True})
+    False
+
+    """
+    if isinstance(obj, dict):
+        return dict, tuple((key, hashable(val)) for key, val in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return type(obj), tuple(map(hashable, obj))
+    if isinstance(obj, (set, frozenset)):
+        return frozenset, frozenset(map(hashable, obj))
+    return type(obj), obj
+
+
+class LRUCache:
+    """A bounded mapping that evicts the least recently used entries
+
+    Lookups with `get` are counted as hits or misses, the statistics can be
+    inspected with `info`, similar to `functools.lru_cache`.  If `maxsize` is
+    `None`, the cache is unbounded.
+
+    By default every entry counts as 1 towards `maxsize`.  Entries can be
+    weighted instead by passing `getsize`, a function that returns the size of
+    a value (e.g. in bytes).
+
+    >>> cache = LRUCache(maxsize=2)
+    >>> cache["a"] = 1
+    >>> cache["b"] = 2
+    >>> cache.get("a")
+    1
+    >>> cache["c"] = 3  # evicts "b", the least recently used entry
+    >>> cache.get("b") is None
+    True
+    >>> cache.info()
+    CacheInfo(hits=1, misses=1, maxsize=2, currsize=2)
+
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = 128,
+        getsize: Optional[Callable[[Any], int]] = None,
+    ):
+        self.maxsize = maxsize
+        self.getsize = getsize
+        self.hits = 0
+        self.misses = 0
+        self.currsize = 0
+        self._data: OrderedDict = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._lock = RLock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def __setitem__(self, key: Hashable, value: Any):
+        with self._lock:
+            self.pop(key)
+            self._data[key] = value
+            self._sizes[key] = 1 if self.getsize is None else self.getsize(value)
+            self.currsize += self._sizes[key]
+            while self.maxsize is not None and self.currsize > self.maxsize:
+                oldest, _ = self._data.popitem(last=False)
+                self.currsize -= self._sizes.pop(oldest)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry, and return its value"""
+        with self._lock:
+            if key not in self._data:
+                return default
+            self.currsize -= self._sizes.pop(key)
+            return self._data.pop(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self):
+        """Remove all entries, and reset the statistics"""
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.hits = self.misses = self.currsize = 0
+
+    def info(self) -> CacheInfo:
+        """Return the cache statistics"""
+        return CacheInfo(self.hits, self.misses, self.maxsize, self.currsize)
+
+
+def _static_all(source: str) -> Optional[List[str]]:
+    """`__all__` in the source of a module, if it is a literal list of strings
+
+    The source is scanned, not parsed, so `__all__` should appear only once
+    in the module (i.e. it is not modified after it is defined).
+
+    """
+    if source.count("__all__") != 1:
+        return None
+    match = re.search(r"^__all__\s*=\s*(\[[^\]]*\]|\([^)]*\))", source, re.M)
+    if match is None:
+        return None
+    try:
+        names = ast.literal_eval(match.group(1))
+    except (ValueError, SyntaxError):
+        return None
+    if not all(isinstance(name, str) for name in names):
+        return None
+    return list(names)
+
+
 class _Names:
     """This is a namespace class used to create and hold several namespaces
 
     The sub-namespaces are properties of this class, and are instantiated on
     first access.  The class attributes `_type_modules` and
     `_validator_modules` are a list of modules.  On first access the
-    corresponding properties (`types` and `validators`) are populated with all
-    the names included in `__all__` in these modules.  This "convention" is
-    used to limit the names that are imported for the sake of namespace
-    pollution.  The different sets of modules are also seperated under
-    different sub-namespaces to reduce the chance of name collissions.
+    corresponding properties (`types` and `validators`) index all the names
+    included in `__all__` in these modules; a module is only imported when
+    one of its names is used.  This "convention" is used to limit the names
+    that are imported for the sake of namespace pollution.  The different
+    sets of modules are also seperated under different sub-namespaces to
+    reduce the chance of name collissions.
 
     This class is not supposed to be accessed directly; instead the singleton
     object instantiated below should be imported.
@@ -51,6 +212,10 @@ class _Names:
     If you want to add your custom modules, they can be included by adding to
     the list of modules _before_ accessing the sub-namespaces.
 
+    Caches that depend on the contents of the namespaces (e.g. of generated
+    types) can be registered with `add_cache`, they are cleared whenever the
+    namespaces are reset.
+
     >>> isinstance(NS.types, SimpleNamespace)
     True
     >>> isinstance(NS.validators, SimpleNamespace)
@@ -85,51 +250,81 @@ class _Names:
     _types = False
     _validators = False
 
+    _caches: List[LRUCache] = []
+
     class _Namespace(SimpleNamespace):
-        def __getitem__(self, attr):
+        """Names from a list of modules, imported on first access
+
+        The namespace holds an index of the names in the modules, and the
+        module that provides each name; a module is only imported when one of
+        its names is accessed.
+
+        """
+
+        def __init__(self, kind: str, mods: Iterable[str], index: Dict[str, str]):
+            super().__init__(_kind=kind, _mods=mods, _index=index)
+
+        def __getattr__(self, attr):  # only called for names not imported yet
+            module = self.__dict__["_index"].get(attr)
+            if module is None:
+                raise AttributeError(
+                    f"{type(self).__name__!r} object has no attribute {attr!r}"
+                )
             try:
-                res = getattr(self, attr)
+                value = getattr(import_module(module), attr)
+            except ModuleNotFoundError as err:
+                raise ValueError(err)
             except AttributeError as err:
-                identifier_re = r"'([a-zA-Z0-9_.]+)'"
-                msg, *_ = err.args
-                obj, attr = re.match(r".+".join([identifier_re] * 2), msg).groups()
-                if type(self).__name__ == obj:
-                    raise RuntimeError(f"{self._mods} has no {self._kind} {attr!r}")
-                else:
-                    raise
-            else:
-                return res
+                raise TypeError(f"non-conformant module: {err}")
+            setattr(self, attr, value)
+            return value
+
+        def __getitem__(self, attr):
+            if attr not in self.__dict__ and attr not in self._index:
+                raise RuntimeError(f"{self._mods} has no {self._kind} {attr!r}")
+            return getattr(self, attr)
 
         def get(self, attr, default=None):
-            try:
-                res = self.__getitem__(attr)
-            except RuntimeError:
+            if attr not in self.__dict__ and attr not in self._index:
                 return default
-            else:
-                return res
+            return getattr(self, attr)
 
-    @classmethod
-    def _import(cls, kind: str, modules: Iterable[str]):
-        """Import names from a nested list of modules to namespace"""
+    @staticmethod
+    def _names(module: str) -> List[str]:
+        """Names in `__all__` of a module, without importing it if possible
+
+        If the module is not imported yet, and `__all__` is a literal list of
+        strings, it is read from the source (see `_static_all`).  Otherwise
+        the module is imported.
+
+        """
         try:
-            mods = [import_module(mod) for mod in modules]
+            if module not in sys.modules:
+                spec = find_spec(module)
+                if spec is None:
+                    raise ModuleNotFoundError(f"No module named {module!r}")
+                if spec.origin and spec.origin.endswith(".py"):
+                    names = _static_all(Path(spec.origin).read_text())
+                    if names is not None:
+                        return names
+            mod = import_module(module)
         except ModuleNotFoundError as err:
             raise ValueError(err)
 
         try:
-            ns = cls._Namespace(
-                **{
-                    name: getattr(mod, name)
-                    for mod in mods
-                    for name in mod.__all__  # type: ignore
-                }
-            )
+            return list(mod.__all__)  # type: ignore
         except AttributeError as err:
             raise TypeError(f"non-conformant module: {err}")
-        else:
-            ns._kind = kind
-            ns._mods = modules
-            return ns
+
+    @classmethod
+    def _import(cls, kind: str, modules: Iterable[str]):
+        """Index the names from a list of modules in a namespace
+
+        Later modules take precedence when a name is repeated.
+
+        """
+        index = {name: mod for mod in modules for name in cls._names(mod)}
+        return cls._Namespace(kind, modules, index)
 
     @property
     def types(self):
@@ -143,10 +338,22 @@ class _Names:
             self._validators = self._import("validator", self._validator_modules)
         return self._validators
 
+    @property
+    def modules(self) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """Type and validator modules the namespaces are populated from"""
+        return tuple(self._type_modules), tuple(self._validator_modules)
+
     def reset(self):
-        """Reset imported types and validators"""
+        """Reset imported types and validators, and clear dependent caches"""
         self._types = False
         self._validators = False
+        for cache in self._caches:
+            cache.clear()
+
+    def add_cache(self, cache: LRUCache) -> LRUCache:
+        """Register a cache to be cleared when the namespaces are reset"""
+        self._caches.append(cache)
+        return cache
 
     def reset_modules(self):
         self._type_modules = self._default_type_modules.copy()
@@ -173,16 +380,47 @@ class _Names:
 NS = _Names()
 
 
+# Use the libyaml bindings to read, and write YAML files; by default (None)
+# when PyYAML is built with them, set to False to force the pure Python
+# implementation.  Both read the same data; the written files are identical,
+# except long double-quoted strings with escapes might be folded differently.
+# NOTE: PyYAML is imported on first use, not when importing this module.
+use_libyaml: Optional[bool] = None
+
+
+def _use_libyaml() -> bool:
+    import yaml
+
+    return yaml.__with_libyaml__ if use_libyaml is None else use_libyaml
+
+
+def _yaml_loader() -> type:
+    import yaml
+
+    return yaml.CSafeLoader if _use_libyaml() else yaml.SafeLoader  # type: ignore
+
+
+def _yaml_dumper() -> type:
+    import yaml
+
+    # NOTE: `yaml.dump` uses the full (not safe) dumper
+    return yaml.CDumper if _use_libyaml() else yaml.Dumper  # type: ignore
+
+
 def read_yaml(fpath: Union[str, Path]) -> Dict:  # pragma: no cover, trivial
     """Read a yaml file into a dictionary"""
+    import yaml
+
     with open(fpath) as fp:
-        return yaml.safe_load(fp)
+        return yaml.load(fp, Loader=_yaml_loader())
 
 
 def to_yaml(obj, fpath: Union[str, Path]):  # pragma: no cover, trivial
     """Serialise Python object to yaml"""
+    import yaml
+
     with open(fpath, mode="w") as fp:
-        yaml.dump(obj, fp)
+        yaml.dump(obj, fp, Dumper=_yaml_dumper())
 
 
 def read_json(fpath: Union[str, Path]) -> Dict:  # pragma: no cover, trivial
@@ -197,6 +435,124 @@ def to_json(obj, fpath: Union[str, Path]):  # pragma: no cover, trivial
         json.dump(obj, fp)
 
 
+def _immutable(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} is immutable")
+
+
+class FrozenDict(dict):
+    """A dictionary that cannot be modified
+
+    It is a subclass of `dict`, so it can be read (and merged) like any other
+    dictionary.  A deep copy returns a mutable copy (see `thaw`).
+
+    >>> conf = FrozenDict({"a": 1})
+    >>> conf["a"] = 2
+    Traceback (most recent call last):
+      ...
+    TypeError: FrozenDict is immutable
+
+    """
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+    def __deepcopy__(self, memo) -> Dict:
+        return thaw(self)
+
+
+class FrozenList(list):
+    """A list that cannot be modified (see `FrozenDict`)"""
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = extend = insert = pop = remove = clear = sort = reverse = _immutable
+
+    def __reduce__(self):
+        return type(self), (list(self),)
+
+    def __deepcopy__(self, memo) -> List:
+        return thaw(self)
+
+
+def freeze(obj: Any) -> Any:
+    """Recursively convert dictionaries, and lists to frozen versions"""
+    if isinstance(obj, dict):
+        return FrozenDict((key, freeze(val)) for key, val in obj.items())
+    if isinstance(obj, list):
+        return FrozenList(map(freeze, obj))
+    return obj
+
+
+def thaw(obj: Any) -> Any:
+    """Recursively copy (frozen) dictionaries, and lists to mutable versions"""
+    if isinstance(obj, dict):
+        return {key: thaw(val) for key, val in obj.items()}
+    if isinstance(obj, list):
+        return list(map(thaw, obj))
+    return obj
+
+
+class DocumentCache:
+    """Cache of parsed documents (e.g. YAML or JSON files)
+
+    Documents are keyed by the resolved path, the modification time, and the
+    size of the file, and the reader; so a modified file is read again.  The
+    cache is bounded by the total size of the files, and the least recently
+    used documents are evicted first.
+
+    Cached documents are deep-frozen (see `FrozenDict`), so they cannot be
+    modified by callers; `merge_rules` returns a mutable copy.
+
+    >>> cache = DocumentCache(maxbytes=2**20)
+    >>> rules = merge_rules("rules.yaml", read_yaml, cache=cache)  # doctest: +SKIP
+
+    Parameters
+    ----------
+    maxbytes : int (default: 64 MiB)
+        Maximum total size of the cached files (on disk)
+    maxfiles : int (default: 4096)
+        Maximum number of files for which the latest version is tracked, so
+        that the stale document is evicted when a file is modified; beyond
+        that, stale documents are only evicted as the least recently used
+
+    """
+
+    def __init__(self, maxbytes: int = 64 * 2**20, maxfiles: int = 4096):
+        self.docs = LRUCache(maxsize=maxbytes, getsize=lambda entry: entry[0])
+        self._keys = LRUCache(maxsize=maxfiles)  # latest key for a path
+
+    def read(self, fpath: Any, reader: Callable[[Any], Dict]) -> Any:
+        """Read a file with `reader`, or return the cached document
+
+        Anything that is not a path (e.g. a stream) is read without caching.
+
+        """
+        if not isinstance(fpath, (str, Path)):
+            return reader(fpath)
+        path = Path(fpath).resolve()
+        stat = path.stat()
+        key = (reader, str(path), stat.st_mtime_ns, stat.st_size)
+        entry = self.docs.get(key)
+        if entry is None:
+            entry = (stat.st_size, freeze(reader(path)))
+            stale = self._keys.get(key[:2])
+            if stale is not None:
+                self.docs.pop(stale)
+            self._keys[key[:2]] = key
+            self.docs[key] = entry
+        return entry[1]
+
+    def clear(self):
+        self.docs.clear()
+        self._keys.clear()
+
+    def info(self) -> CacheInfo:
+        """Return the cache statistics, sizes are in bytes"""
+        return self.docs.info()
+
+
 def merge_dicts(confs: Sequence[Dict]) -> Dict:
     """Merge a sequence of dictionaries
 
@@ -239,25 +595,184 @@ def merge_dicts(confs: Sequence[Dict]) -> Dict:
     True
 
     """
-    if not all(map(lambda obj: isinstance(obj, dict), confs)):
+    if not all(isinstance(obj, dict) for obj in confs):
         return confs[-1]
 
+    # one pass over the inputs: a key keeps the position of its first
+    # occurence, and only the values of repeated keys are collected
     res: Dict[str, Any] = {}
-    for key, count in Counter(chain.from_iterable(confs)).items():
-        matches = [conf[key] for conf in confs if key in conf]
-        if count > 1:
-            res[key] = merge_dicts(matches)  # duplicate keys, recurse
-        else:
-            res[key] = matches[0]  # only one element
+    repeated: Dict[str, List] = {}
+    for conf in confs:
+        for key, val in conf.items():
+            if key not in res:
+                res[key] = val
+            elif key in repeated:
+                repeated[key].append(val)
+            else:
+                repeated[key] = [res[key], val]
+    for key, matches in repeated.items():
+        res[key] = merge_dicts(matches)  # duplicate keys, recurse
     return res
 
 
+def merge_into(acc: Dict, conf: Dict) -> Dict:
+    """Merge a dictionary into another, in place
+
+    The result is the same as ``merge_dicts([acc, conf])``, but `acc` is
+    updated instead of building a new dictionary, so merging a sequence of
+    small overrides into a large config only touches the overridden keys.
+    Untouched subtrees are not copied; nested dictionaries that are merged
+    into are copied first, so dictionaries shared with earlier inputs are not
+    modified.
+
+    NOTE: folding a sequence with `merge_into` is the same as `merge_dicts`,
+    unless the values of a key mix dictionaries, and other values.
+    `merge_dicts` then keeps only the last value, whereas the fold merges the
+    dictionaries after the last non-dictionary value.
+
+    Parameters
+    ----------
+    acc: Dict
+        Dictionary to merge into, modified in place
+    conf: Dict
+        Dictionary to merge, not modified
+
+    Returns
+    -------
+    Dict
+        The accumulator `acc`
+
+    Examples
+    --------
+
+    >>> base = {"a": 1, "b": {"c": 3, "d": 4}}
+    >>> acc = dict(base)
+    >>> for override in [{"b": {"d": 40}}, {"e": 5}, {"b": {"f": 6}}]:
+    ...     acc = merge_into(acc, override)
+    >>> acc
+    {'a': 1, 'b': {'c': 3, 'd': 40, 'f': 6}, 'e': 5}
+    >>> base["b"]  # not modified
+    {'c': 3, 'd': 4}
+
+    Values that mix dictionaries, and other values:
+
+    >>> confs = [{"a": 1}, {"a": {"b": 2}}, {"a": {"c": 3}}]
+    >>> merge_dicts(confs)
+    {'a': {'c': 3}}
+    >>> merge_into(merge_into(dict(confs[0]), confs[1]), confs[2])
+    {'a': {'b': 2, 'c': 3}}
+
+    """
+    for key, val in conf.items():
+        old = acc.get(key)
+        if isinstance(old, dict) and isinstance(val, dict):
+            acc[key] = merge_into(dict(old), val)
+        else:
+            acc[key] = val
+    return acc
+
+
 _file_t = TypeVar("_file_t", str, Path, TextIO)
 
 
-def merge_rules(
+def read_documents(
     fpaths: Union[_file_t, List[_file_t], Tuple[_file_t]],
     reader: Callable[[_file_t], Dict],
+    cache: Optional[DocumentCache] = None,
+    max_workers: Optional[int] = None,
+) -> List[Dict]:
+    """Read a file, or a sequence of files, in order (see `merge_rules`)"""
+    if cache is not None:
+        reader = partial(cache.read, reader=reader)
+    if isinstance(fpaths, (list, tuple)) and max_workers and len(fpaths) > 1:
+        with ThreadPoolExecutor(max_workers) as pool:
+            return list(pool.map(reader, fpaths))
+    if isinstance(fpaths, (list, tuple)):
+        return [reader(f) for f in fpaths]
+    return [reader(fpaths)]
+
+
+class LayeredMapping(Mapping):
+    """A read-only view of a sequence of dictionaries, merged on access
+
+    Keys are resolved across the layers with the same rules as `merge_dicts`:
+    a later layer overrides earlier ones, and keys are ordered by their first
+    occurence.  Nested dictionaries are returned as views, so only the keys
+    that are read are resolved, and the layers are never copied.  Many
+    variants of a config can share the same layers (e.g. documents from a
+    `DocumentCache`).
+
+    A view can be used in place of a list of config files with `merge_rules`
+    (and so `get_config`, or `graph.Builder`); it is materialised then.  To
+    create a view of files, use `LayeredMapping.from_files`.
+
+    >>> view = LayeredMapping([{"a": 1, "b": {"c": 3}}, {"b": {"d": 4}, "e": 5}])
+    >>> list(view), view["b"]["d"]
+    (['a', 'b', 'e'], 4)
+    >>> view.materialise()
+    {'a': 1, 'b': {'c': 3, 'd': 4}, 'e': 5}
+
+    """
+
+    def __init__(self, layers: Sequence[Dict]):
+        self.layers = tuple(layers)
+        self._views: Dict[str, LayeredMapping] = {}
+
+    @classmethod
+    def from_files(
+        cls,
+        fpaths: Union[_file_t, List[_file_t], Tuple[_file_t]],
+        reader: Callable[[_file_t], Dict],
+        cache: Optional[DocumentCache] = None,
+        max_workers: Optional[int] = None,
+    ) -> "LayeredMapping":
+        """View of the files, like `merge_rules` without merging them
+
+        With a `DocumentCache`, the layers are the cached documents, so the
+        views of many variants share the documents they have in common.
+
+        """
+        return cls(read_documents(fpaths, reader, cache, max_workers))
+
+    def __getitem__(self, key: str) -> Any:
+        view = self._views.get(key)
+        if view is not None:
+            return view
+        values = [layer[key] for layer in self.layers if key in layer]
+        if not values:
+            raise KeyError(key)
+        if not all(isinstance(val, dict) for val in values):
+            return values[-1]  # like merge_dicts, the last value wins
+        view = self._views[key] = LayeredMapping(values)
+        return view
+
+    def __contains__(self, key: object) -> bool:
+        return any(key in layer for layer in self.layers)
+
+    def __iter__(self) -> Iterator[str]:
+        seen = set()
+        for layer in self.layers:
+            for key in layer:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self) -> int:
+        return len(set().union(*self.layers))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self.layers)} layers)"
+
+    def materialise(self) -> Dict:
+        """Merge the layers into a new, mutable dictionary"""
+        return thaw(merge_dicts(self.layers))
+
+
+def merge_rules(
+    fpaths: Union[_file_t, List[_file_t], Tuple[_file_t], LayeredMapping],
+    reader: Callable[[_file_t], Dict],
+    cache: Optional[DocumentCache] = None,
+    max_workers: Optional[int] = None,
 ) -> Dict:
     """Merge a sequence of dictionaries
 
@@ -272,19 +787,27 @@ def merge_rules(
 
     Parameters
     ----------
-    fpaths: Union[T, List[T], Tuple[T]]
+    fpaths: Union[T, List[T], Tuple[T], LayeredMapping]
         Path to a rules file, or a sequence of paths
     reader: Callable[[T], Dict]
         Function used to read the files; should return a dictionary
+    cache: DocumentCache (optional)
+        Cache of parsed documents, files are only read if they are not cached,
+        or have been modified
+    max_workers: int (optional)
+        Read a sequence of files concurrently in a pool of threads; the files
+        are merged in the same order as they are listed
 
     Returns
     -------
     Dict
-        Dictionary after merging rules
+        Dictionary after merging rules; a `LayeredMapping` passed instead of
+        files is materialised
 
     """
-    if isinstance(fpaths, (list, tuple)):
-        conf = merge_dicts([reader(f) for f in fpaths])
-    else:
-        conf = reader(fpaths)
-    return conf
+    if isinstance(fpaths, LayeredMapping):
+        return fpaths.materialise()
+    docs = read_documents(fpaths, reader, cache, max_workers)
+    conf = merge_dicts(docs) if isinstance(fpaths, (list, tuple)) else docs[0]
+    # cached documents are shared, return a mutable copy
+    return conf if cache is None else thaw(conf)
@@ -12,7 +12,7 @@ which can be used to validate the config file provided by the user.
 from __future__ import annotations
 
 from abc import ABC
-from dataclasses import asdict, fields, is_dataclass, MISSING
+from dataclasses import asdict, fields, is_dataclass
 import logging
 from pathlib import Path
 from typing import Dict, List, Tuple, Type, TypeVar, Union
@@ -40,19 +40,26 @@ class _ConfigIO(ABC):
     """
 
     def __post_init__(self):
-        for f in fields(self):
-            if is_dataclass(f.type):
-                defaults = {}
-                for _f in fields(f.type):
-                    if _f.default != MISSING:
-                        val = _f.default
-                    elif _f.default_factory != MISSING:
-                        val = _f.default_factory()
-                    else:
-                        continue
-                    defaults[_f.name] = val
-                kwargs = getattr(self, f.name)
-                setattr(self, f.name, f.type(**{**defaults, **kwargs}))
+        # NOTE: nested types fill in their own defaults, and instances are
+        # already validated (pydantic does not validate them again)
+        for name, _type in self._nested_fields():
+            kwargs = getattr(self, name)
+            if not isinstance(kwargs, _type):
+                setattr(self, name, _type(**kwargs))
+
+    @classmethod
+    def _nested_fields(cls) -> Tuple[Tuple[str, Type], ...]:
+        """Fields with a nested config type, computed once per class"""
+        try:
+            return cls.__dict__["__nested_fields__"]
+        except KeyError:
+            nested = tuple(
+                (f.name, f.type)
+                for f in fields(cls)  # type: ignore[arg-type]
+                if isinstance(f.type, type) and is_dataclass(f.type)
+            )
+            cls.__nested_fields__ = nested  # type: ignore
+            return nested
 
     @classmethod
     def inherits_from(cls, type_names: List[str]) -> bool:
@@ -78,7 +85,7 @@ class _ConfigIO(ABC):
         def importer(type_name: str) -> Union[Type, None]:
             try:
                 _type = get_property(type_name)
-            except AttributeError:
+            except (AttributeError, ImportError):  # not registered
                 _type = Type
             return _type
 
@@ -0,0 +1,295 @@
+"""Ahead-of-time code generation of config types
+
+Building the config type at runtime requires reading, and parsing the rules,
+and then creating all the nested types.  Instead, this module can generate a
+plain Python module from the rules, with the equivalent type definitions.
+The generated module can then be imported like any other module (and its
+bytecode is cached by the interpreter).
+
+>>> compile_module("rules.yaml", "rules_t.py")  # doctest: +SKIP
+>>> config_t = load_config_t("rules_t.py")  # doctest: +SKIP
+
+The generated module embeds a fingerprint of the rules, which is used to
+detect if the module is stale:
+
+>>> config_t = load_config_t("rules_t.py", "rules.yaml")  # doctest: +SKIP
+
+Since the config is not known in advance, optional keys cannot be pruned
+like `get_config` does.  Instead they are generated as `Optional[<type>]`,
+and default to `None` when they do not have a default.
+
+The module can also be used as a script:
+
+  python -m typedconfig.parsers.codegen rules.yaml [rules2.yaml ...] rules_t.py
+
+"""
+
+from argparse import ArgumentParser
+import ast
+from importlib import import_module
+from importlib.util import cache_from_source, module_from_spec
+from importlib.util import spec_from_file_location
+from pathlib import Path
+import re
+from types import ModuleType
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+from typedconfig.helpers import fingerprint, merge_rules, NS, read_yaml
+from typedconfig.parsers import _fpaths
+from typedconfig.parsers.tree import (
+    branch_validators,
+    compile_rules,
+    parse_validator,
+    RuleNode,
+)
+
+# bump when the generated code changes, so that older modules are regenerated
+_format = 3
+
+_header = '''"""Config types generated by typedconfig, do not edit"""
+
+from dataclasses import field
+from typing import Optional
+
+from typedconfig.factory import make_typedconfig, make_validator
+from typedconfig.parsers import _ConfigIO
+'''
+
+
+def rules_fingerprint(rules: Dict) -> str:
+    """Fingerprint of the rules, and the namespace modules"""
+    return fingerprint([_format, rules, NS.modules])
+
+
+class _Generator:
+    """Generate the source for the type definitions from the rules tree"""
+
+    def __init__(self) -> None:
+        self.modules: Dict[str, str] = {}  # module name -> alias
+
+    def ref(self, kind: str, name: str) -> str:
+        """Reference to a name in the type or validator namespace"""
+        type_modules, validator_modules = NS.modules
+        for module in reversed(type_modules if kind == "type" else validator_modules):
+            # like the namespaces, later modules take precedence
+            if name in import_module(module).__all__:  # type: ignore
+                alias = self.modules.setdefault(module, f"_m{len(self.modules)}")
+                return f"{alias}.{name}"
+        raise ValueError(f"{name!r}: not found in {kind} modules")
+
+    def type_expr(self, node: RuleNode) -> str:
+        if not isinstance(node.type, str):
+            raise TypeError(f"{node.path}: cannot generate code for {node.type!r}")
+        expr = self.ref("type", node.type)
+        opts = node.opts
+        if opts and isinstance(opts, (tuple, list, set)):
+            args = [
+                self.ref("type", i) if _is_type_name(i) else literal(i) for i in opts
+            ]
+            expr = f"{expr}[({', '.join(args)},)]"
+        elif opts and isinstance(opts, dict):
+            expr = f"{expr}(**{literal(opts)})"
+        elif opts:
+            raise ValueError(f"{node.path}: ambiguous option {opts!r}")
+        if node.optional:
+            expr = f"Optional[{expr}]"
+        return expr
+
+    def field_expr(self, key: str, node: RuleNode, _type: str) -> Tuple[str, bool]:
+        default = node.default if node.is_leaf else None
+        if default is None and not (node.is_leaf and node.optional):
+            return f"({key!r}, {_type})", False
+        if default == "_None":
+            default = None
+        if isinstance(default, (dict, list)):
+            _field = f"field(default_factory=lambda: {literal(default)})"
+        else:
+            _field = f"field(default={literal(default)})"
+        return f"({key!r}, {_type}, {_field})", True
+
+    def validator_exprs(self, key: str, spec: Dict) -> List[str]:
+        funcs, key, opts = parse_validator(key, spec)
+        return [
+            f"**make_validator({self.ref('validator', fn)}, {key!r}, "
+            f"opts={literal(opts)}, **{literal(params)})"
+            for fn, params in funcs
+        ]
+
+    def branch(self, branch: RuleNode, key: str, var: str, names: Dict) -> str:
+        _fields: List[str] = []
+        _defaults: List[str] = []
+        for _key, child in branch.children.items():
+            _type = self.type_expr(child) if child.is_leaf else names[child.path]
+            item, has_default = self.field_expr(str(_key), child, _type)
+            (_defaults if has_default else _fields).append(item)
+        validators = [
+            expr
+            for _key, spec in branch_validators(branch, key)
+            for expr in self.validator_exprs(_key, spec)
+        ]
+        lines = [f"{var} = make_typedconfig(", f"    {key + '_t'!r},", "    ["]
+        lines += [f"        {item}," for item in _fields + _defaults]
+        lines += ["    ],"]
+        if validators:
+            lines += ["    namespace={"]
+            lines += [f"        {expr}," for expr in validators]
+            lines += ["    },"]
+        if not branch.path:
+            lines += ["    bases=(_ConfigIO,),"]
+        lines += [")"]
+        return "\n".join(lines)
+
+
+def _is_type_name(value: Any) -> bool:
+    return isinstance(value, str) and NS.types.get(value) is not None
+
+
+def literal(value: Any) -> str:
+    """Source representation of a value, only literals are supported"""
+    source = repr(value)
+    try:
+        ast.literal_eval(source)
+    except (ValueError, SyntaxError):
+        raise ValueError(f"{value!r}: cannot be represented in source") from None
+    return source
+
+
+def generate(rules: Dict) -> str:
+    """Generate the source of a module with the config type for the rules
+
+    Parameters
+    ----------
+    rules : Dict
+        Rules dictionary (after merging)
+
+    Returns
+    -------
+    str
+        Module source; the config type is named `config_t`, and the
+        fingerprint of the rules is stored in `FINGERPRINT`.  Nested types
+        are numbered (`_t0`, `_t1`, ...), as section names may collide when
+        joined; the path of a section is in a comment before its type.
+
+    """
+    gen = _Generator()
+    root = compile_rules(rules)
+    names: Dict[Tuple, str] = {}
+    defs = []
+    for branch in root.bottom_up():
+        key = str(branch.path[-1]) if branch.path else "config"
+        var = f"_t{len(names)}" if branch.path else "config_t"
+        names[branch.path] = var
+        comment = f"# {'.'.join(map(str, branch.path)) or '<root>'}"
+        defs.append(f"{comment}\n{gen.branch(branch, key, var, names)}")
+
+    imports = [f"import {mod} as {alias}" for mod, alias in gen.modules.items()]
+    return "\n".join(
+        [
+            _header,
+            *imports,
+            "",
+            f"FINGERPRINT = {rules_fingerprint(rules)!r}",
+            "",
+            *(f"\n{_def}\n" for _def in defs),
+        ]
+    )
+
+
+def compile_module(rule_files: _fpaths, module_path: Union[str, Path]) -> Path:
+    """Generate a module with the config type from the rules files
+
+    Parameters
+    ----------
+    rule_files : Path | List[Path]
+        Rules files, they are merged like in `get_config`
+    module_path : Union[str, Path]
+        Path to the generated module
+
+    Returns
+    -------
+    Path
+        Path to the generated module
+
+    """
+    return _write(module_path, generate(merge_rules(rule_files, read_yaml)))
+
+
+def _write(module_path: Union[str, Path], source: str) -> Path:
+    module_path = Path(module_path)
+    module_path.write_text(source)
+    # bytecode is validated by the source mtime (in seconds) & size, which
+    # might not change when regenerated quickly
+    try:
+        Path(cache_from_source(str(module_path))).unlink()
+    except FileNotFoundError:
+        pass
+    return module_path
+
+
+def read_fingerprint(module_path: Union[str, Path]) -> Optional[str]:
+    """Read the fingerprint of a generated module without importing it"""
+    try:
+        source = Path(module_path).read_text()
+    except FileNotFoundError:
+        return None
+    match = re.search(r"^FINGERPRINT = (.+)$", source, re.MULTILINE)
+    if match is None:
+        return None
+    try:
+        return ast.literal_eval(match.group(1))
+    except (ValueError, SyntaxError):
+        return None
+
+
+def import_path(module_path: Union[str, Path]) -> ModuleType:
+    """Import a module from its path"""
+    module_path = Path(module_path)
+    spec = spec_from_file_location(module_path.stem, module_path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"{module_path}: cannot import module")
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)  # type: ignore
+    return module
+
+
+def load_config_t(
+    module_path: Union[str, Path], rule_files: Optional[_fpaths] = None
+) -> Type:
+    """Load the config type from a generated module
+
+    Parameters
+    ----------
+    module_path : Union[str, Path]
+        Path to the generated module
+    rule_files : Path | List[Path] (optional)
+        Rules files the module was generated from.  If provided, the module is
+        (re)generated when it is missing or stale; the fingerprint is read
+        from the source, so a stale module is never imported.
+
+    Returns
+    -------
+    Type
+        Config type
+
+    """
+    module_path = Path(module_path)
+    if rule_files is None:
+        return import_path(module_path).config_t
+
+    rules = merge_rules(rule_files, read_yaml)
+    # a stale module is not imported, its types might not be valid anymore
+    if read_fingerprint(module_path) != rules_fingerprint(rules):
+        _write(module_path, generate(rules))
+    return import_path(module_path).config_t
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = ArgumentParser(description="Generate a module with the config type")
+    parser.add_argument("rule_files", nargs="+", type=Path, help="Rules files")
+    parser.add_argument("module_path", type=Path, help="Generated module")
+    args = parser.parse_args(argv)
+    compile_module(args.rule_files, args.module_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,25 +5,31 @@
 
 """
 
-from copy import copy
-from dataclasses import asdict, fields, replace
-from functools import partial
+from copy import copy, deepcopy
+from dataclasses import fields
 import logging
 from pathlib import Path
-from typing import Callable, Dict, List, Tuple, Type, TypeVar
-
-from glom import Assign, Coalesce, glom
-from glom import Path as gPath
-from networkx import DiGraph, Graph
-from networkx import find_cycle, topological_sort
-from networkx import NetworkXNoCycle
+from types import FunctionType, MethodType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
 from typedconfig import register
-from typedconfig.helpers import merge_dicts, merge_rules, read_yaml
+from typedconfig.factory import set_lazy_recipe, set_recipe
+from typedconfig.helpers import fingerprint, merge_dicts, merge_rules, NS, read_yaml
 from typedconfig.parsers import _ConfigIO
 from typedconfig.parsers.tree import (
     path_if,
-    is_node,
     is_mandatory,
     spec_to_type,
     _type_spec,
@@ -34,6 +40,33 @@ from typedconfig.parsers.tree import (
 
 log = logging.getLogger(__name__)
 
+# NOTE: networkx, and glom are imported where they are used, so that importing
+# this module (e.g. to unpickle a property) stays fast
+
+
+def flat_index(data: Dict) -> Dict[Tuple, Any]:
+    """Index the values of a nested dictionary by their path
+
+    The paths are in the order of the dictionary (depth first, a key comes
+    before the keys nested under it).
+
+    >>> flat_index({"a": {"b": 1}, "c": 2})
+    {('a',): {'b': 1}, ('a', 'b'): 1, ('c',): 2}
+
+    """
+    index: Dict[Tuple, Any] = {}
+    stack: List[Tuple[Tuple, Iterator]] = [((), iter(data.items()))]
+    while stack:
+        path, items = stack[-1]
+        for key, value in items:
+            index[path + (key,)] = value
+            if isinstance(value, dict):  # descend, resume the siblings after
+                stack.append((path + (key,), iter(value.items())))
+                break
+        else:
+            stack.pop()
+    return index
+
 
 class spec_dict:
     """This is a wrapper around the rules dictionary.
@@ -43,12 +76,17 @@ class spec_dict:
     >>> spec = spec_dict(rules)  # doctest: +SKIP
     >>> conf = spec.with_property(conf_dict_for_propa)  # doctest: +SKIP
 
+    The rules, and the property are indexed by path (see `flat_index`) when
+    they are set, so looking up a path does not walk the dictionary.  The
+    index of a property is not updated if it is modified later.
+
     """
 
     def __init__(self, attrs: Dict):
         attrs, _, leaf_paths = get_spec(attrs)
         self.attrs = attrs
         self.attr_paths = leaf_paths
+        self.attr_index = flat_index(attrs)
         self.reset_property()
 
     def with_property(self, prop: Dict):
@@ -57,27 +95,42 @@ class spec_dict:
 
     def set_property(self, prop: Dict):
         self.prop = prop
-        self.prop_paths = [p for p in path_if(prop, is_node) if p in self.attr_paths]
+        self.prop_index = flat_index(prop)
+        self.prop_paths = [p for p in self.prop_index if p in self.attr_paths]
         self._data = self.prop
+        self._index = self.prop_index
         self._paths = self.prop_paths
         return self
 
     def reset_property(self):
-        self.prop = self.prop_paths = None
+        self.prop = self.prop_paths = self.prop_index = None
         self._data = self.attrs
+        self._index = self.attr_index
         self._paths = self.attr_paths
 
     def __getitem__(self, path: Tuple):
-        return glom(self._data, gPath(*path))
+        try:
+            return self._index[path]
+        except KeyError:  # not a path of nested dictionaries, e.g. a list item
+            from glom import glom, Path as gPath
+
+            return glom(self._data, gPath(*path))
 
     def __contains__(self, path: Tuple) -> bool:
+        if path in self._index:
+            return bool(self._index[path])
+        from glom import Coalesce, glom, Path as gPath
+
         return glom(self._data, (Coalesce(gPath(*path), default=False), bool))
 
     def __iter__(self):
         return iter(self._paths)
 
-    def filter(self, test: Callable):
-        return path_if(self._data, test)
+    def filter(self, test: Callable) -> List[Tuple]:
+        # in the order of the rules, so that the order of fields, and so the
+        # values seen by validators, does not depend on set ordering
+        matches = path_if(self._data, test)
+        return [path for path in self._index if path in matches]
 
     def __repr__(self) -> str:
         return str({k: self[k] for k in self})
@@ -106,6 +159,8 @@ def attr_defaults(attrs: Dict[str, Dict]) -> Tuple[Dict[str, Dict], Dict]:
         Tuple of the rules dictionary, and defaults separated out.
 
     """
+    from glom import glom, Path as gPath
+
     def_key = _type_spec[6]
     # all attributes with defaults
     defaults = get_from_leaf(attrs, [def_key])
@@ -124,6 +179,8 @@ def properties(
     props: Dict[str, Dict],
     base_property_name: str = "baseprop",
     type_namespace: str = "dynamic",
+    share_types: bool = False,
+    _recipe_key: Optional[Hashable] = None,
 ) -> Dict:
     """Create a (optional) hierarchy of properties
 
@@ -136,6 +193,24 @@ def properties(
 
     >>> from typedconfig.dynamic import property_t  # doctest: +SKIP
 
+    The property types are stamped with a recipe (the arguments of this
+    function), so they can be pickled, and rebuilt in another process.  The
+    recipe key, a fingerprint of the arguments, is computed when a property
+    type is first pickled (see `set_lazy_recipe`).
+
+    A derived property inherits the attribute values of its parent as is,
+    they are not copied (validation copies the top level of containers, but
+    nested values are shared); so inherited values should not be modified in
+    place.  The derived property is still validated with all its attribute
+    values, inherited or not, as its type may add validators.
+
+    With `share_types`, properties with the same set of attributes, and the
+    same parent type share one validated type (named "shared<n>_t"), which
+    is expensive to create.  Every property still has its own type, an
+    empty subclass of the shared type, so `isinstance`, and `inherits_from`
+    behave as without sharing.  This makes building many similar properties
+    faster, and uses less memory.
+
     Parameters
     ----------
     attr_rules : Dict[str, Dict]
@@ -151,6 +226,9 @@ def properties(
     type_namespace : str (default: 'dynamic')
         Custom property types are registered under:
         'typedconfig._{type_namespace}'.
+    share_types : bool (default: False)
+        Share one type between properties with the same attributes, and the
+        same parent type
 
     Returns
     -------
@@ -169,13 +247,16 @@ def properties(
         If the attribute rules are erroneous (most likely reason)
 
     """
+    from networkx import DiGraph, find_cycle, NetworkXNoCycle, topological_sort
+
     # create inheritance tree
     parent_key = "parent"
     dep_gr = DiGraph()
     dep_gr.add_nodes_from(props.keys())
     dep_gr.add_edges_from(
-        (glom(props, i), i[0])
-        for i in path_if(props, lambda p, k, v: k == parent_key and v)
+        (value, path[0])
+        for path, value in flat_index(props).items()
+        if path[-1] == parent_key and value
     )
     try:
         loop = find_cycle(dep_gr, orientation="original")
@@ -191,11 +272,48 @@ def properties(
             f"properties with cyclic dependency: {dep_gr.edges}\nloop={loop}"
         )
 
-    _register = partial(register, submodule=type_namespace)
+    # property types are stamped with a recipe, so that they can be pickled;
+    # the inputs are copied (the properties, only shallowly), but the recipe
+    # key is only computed when a property type is first pickled
+    recipe_args = (
+        deepcopy(attr_rules),
+        deepcopy(defaults),
+        {name: copy(prop) for name, prop in props.items()},
+        base_property_name,
+        type_namespace,
+        share_types,
+    )
+    recipe_types: Dict[Tuple, Type] = {}
+    modules = NS.modules
+
+    def _stamp():
+        key = (fingerprint(recipe_args), modules)
+        for path, prop_t in recipe_types.items():
+            set_recipe(prop_t, properties, key, (*recipe_args, key), path)
+
+    def _set_recipe(prop_t: Type, path: Tuple) -> Type:
+        recipe_types[path] = prop_t
+        if _recipe_key is None:
+            return set_lazy_recipe(prop_t, _stamp)
+        # rebuilt from a recipe
+        return set_recipe(
+            prop_t, properties, _recipe_key, (*recipe_args, _recipe_key), path
+        )
+
+    def _register(prop_t: Type, name: str) -> Type:
+        _set_recipe(prop_t, (name,))
+        return register(prop_t, submodule=type_namespace)
+
     spec = spec_dict(attr_rules)
-    baseprop_t = _register(make_baseprop_t(spec, base_property_name))
+    baseprop_t = _register(
+        make_baseprop_t(spec, base_property_name), base_property_name
+    )
 
     res = {base_property_name: baseprop_t}
+    # shared property types by signature: attributes, and base types
+    shared: Dict[Tuple[FrozenSet[str], Tuple[Type, ...]], Type] = {}
+    # attribute values of parent properties, by name
+    inherited_values: Dict[str, Dict] = {}
     for prop in topological_sort(dep_gr):  # properties, sorted parent to child
         # attribute value pairs for current property
         conf = spec.with_property(props[prop])
@@ -208,9 +326,26 @@ def properties(
             raise
         else:
             _spec = {str(path[-1]): spec[path] for path in conf}
-            prop_t = _register(spec_to_type(prop, _spec, bases=_bases))
-
-        inherited = asdict(res[inherit_from]) if inherit_from else {}
+            signature = (frozenset(_spec), _bases)
+            if not share_types:
+                prop_t = _register(spec_to_type(prop, _spec, bases=_bases), prop)
+            else:
+                if signature not in shared:
+                    # the path cannot collide with a property name, (name,)
+                    name, path = f"shared{len(shared)}", ("", len(shared))
+                    shared_t = spec_to_type(name, _spec, bases=_bases)
+                    shared[signature] = _set_recipe(shared_t, path)
+                # a subclass per property, so its ancestry is its own
+                shared_t = shared[signature]
+                prop_t = _register(type(f"{prop}_t", (shared_t,), {}), prop)
+
+        if inherit_from and inherit_from not in inherited_values:
+            # shallow: the values are shared with the parent, not copied
+            parent = res[inherit_from]
+            inherited_values[inherit_from] = {
+                field.name: getattr(parent, field.name) for field in fields(parent)
+            }
+        inherited = inherited_values[inherit_from] if inherit_from else {}
         # find applicable attributes with defaults
         _fields = set(defaults).intersection(f.name for f in fields(prop_t))
         _fields -= set(inherited)
@@ -229,11 +364,139 @@ def properties(
     return res
 
 
+class PropertyOverlay:
+    """A property with some attributes overridden
+
+    The overlay references the (shared) base property, and only stores the
+    overridden attributes; only these, and the attributes with validators
+    (which may depend on the overridden values) are validated, instead of
+    all the attributes like `dataclasses.replace`.  If the property type has
+    root validators, all the attributes are validated.
+
+    >>> tech = PropertyOverlay(props["ccgt"], energy_cap_max=10)  # doctest: +SKIP
+    >>> tech.energy_cap_max, tech.lifetime  # doctest: +SKIP
+    (10.0, 25)
+
+    Otherwise it behaves like the property: attributes of the base property
+    are accessible, methods of the property type (e.g. `to_dict`) see the
+    overridden values, `isinstance` checks against the property type, and
+    `dataclasses.asdict`, and `dataclasses.replace` work (the latter returns
+    a property).  Attributes assigned on the overlay are not validated, like
+    on a property.
+
+    Parameters
+    ----------
+    base : property
+        The property, if it is an overlay itself, its overrides are merged
+    **overrides
+        Attributes to override
+
+    Raises
+    ------
+    TypeError
+        If an attribute is not a field of the property
+    ValidationError
+        If the validation of an overridden attribute fails
+
+    """
+
+    __slots__ = ("_base", "_overrides")
+
+    def __init__(self, base, **overrides):
+        if type(base) is PropertyOverlay:
+            overrides = {**base._overrides, **overrides}
+            base = base._base
+        object.__setattr__(self, "_base", base)
+        object.__setattr__(self, "_overrides", self._validate(base, overrides))
+
+    @staticmethod
+    def _validate(base, overrides: Dict) -> Dict:
+        from pydantic import ValidationError
+        from pydantic.main import validate_model
+
+        cls = type(base)
+        model = cls.__pydantic_model__
+        unknown = set(overrides).difference(model.__fields__)
+        if unknown:
+            raise TypeError(f"{cls.__name__}: unexpected attributes {unknown}")
+        if model.__pre_root_validators__ or model.__post_root_validators__:
+            values = {name: getattr(base, name) for name in model.__fields__}
+            values, _, error = validate_model(model, {**values, **overrides}, cls=cls)
+            if error:
+                raise error
+            return {name: values[name] for name in overrides}
+
+        # like validate_model: fields in order, validators see the values of
+        # the preceding fields; fields with validators are validated again, as
+        # their validators may depend on the overridden values
+        res, errors, values = {}, [], {}
+        for name, field in model.__fields__.items():
+            value = overrides[name] if name in overrides else getattr(base, name)
+            if name in overrides or field.class_validators:
+                value, error = field.validate(value, values, loc=name, cls=cls)
+                if error:
+                    errors.append(error)
+                    continue
+            if name in overrides:
+                res[name] = value
+            values[name] = value
+        if errors:
+            raise ValidationError(errors, model)
+        return res
+
+    @property  # type: ignore[misc]
+    def __class__(self):  # for isinstance
+        return type(self._base)
+
+    @property
+    def __dataclass_fields__(self):  # for dataclasses.fields, asdict, etc
+        return self._base.__dataclass_fields__
+
+    def __getattr__(self, name: str):
+        if name in PropertyOverlay.__slots__:  # not initialised yet
+            raise AttributeError(name)
+        try:
+            return self._overrides[name]
+        except KeyError:
+            pass
+        # methods, and properties of the type see the overridden values
+        attr = getattr(type(self._base), name, None)
+        if isinstance(attr, FunctionType):
+            return MethodType(attr, self)
+        if isinstance(attr, property) and attr.fget is not None:
+            return attr.fget(self)
+        return getattr(self._base, name)
+
+    def __setattr__(self, name: str, value):
+        self._overrides[name] = value
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(
+            getattr(self, f.name) == getattr(other, f.name) for f in fields(self._base)
+        )
+
+    def __repr__(self) -> str:
+        values = ", ".join(
+            f"{f.name}={getattr(self, f.name)!r}" for f in fields(self._base)
+        )
+        return f"{self.__class__.__qualname__}({values})"
+
+    def __reduce__(self):
+        return _overlay, (self._base, self._overrides)
+
+
+def _overlay(base, overrides: Dict) -> PropertyOverlay:
+    return PropertyOverlay(base, **overrides)
+
+
 def nodes(attr_rules: Dict[str, Dict], props: Dict, _nodes: Dict[str, Dict]) -> Dict:
     """Create nodes that are related by an inheritance hierarchy.
 
     Each node has a set of attributes (which can be inherited by a child), and
-    a special attribute ``techs`` holds a set of properties.
+    a special attribute ``techs`` holds a set of properties.  Properties with
+    attributes overridden for the node are `PropertyOverlay` instances.
 
     Parameters
     ----------
@@ -251,10 +514,12 @@ def nodes(attr_rules: Dict[str, Dict], props: Dict, _nodes: Dict[str, Dict]) ->
         Dictionary of nodes with associated properties
 
     """
+    from glom import Assign, glom
+
     # FIXME: use a generic term like "properties" instead of "techs"
     for node, val in _nodes.items():
         _props = {
-            pname: replace(props[pname], **prop) if prop else props[pname]
+            pname: PropertyOverlay(props[pname], **prop) if prop else props[pname]
             for pname, prop in val.pop("techs", {}).items()
         }
         glom(_nodes, Assign(f"{node}.techs", _props, missing=dict))
@@ -272,7 +537,8 @@ def edges(
     """Create a set of edges between a set of interconnected nodes.
 
     Each edge has a set of attributes, and a special attribute ``techs`` holds
-    a set of properties.
+    a set of properties.  Properties with attributes overridden for the edge
+    are `PropertyOverlay` instances.
 
     Parameters
     ----------
@@ -305,7 +571,7 @@ def edges(
             edge_props = merge_dicts([_props_n1, _props_n2.pop("techs", {})])
             # update properties
             _props_n2["techs"] = {
-                pname: replace(props[pname], **prop) if prop else props[pname]
+                pname: PropertyOverlay(props[pname], **prop) if prop else props[pname]
                 for pname, prop in edge_props.items()
             }
             # edges with concatenated keys
@@ -328,29 +594,47 @@ _file_t = TypeVar("_file_t", str, Path)
 
 
 class Builder:
+    """Build properties, nodes, and edges from rules, and config files
+
+    Every method that reads files accepts `max_workers`, to read a list of
+    files concurrently (see `merge_rules`).  A `LayeredMapping` can be passed
+    instead of a list of files.
+
+    """
+
     _graph = False
     _digraph = False
 
-    def __init__(self, rules: List[_file_t]):
-        self.attrs, self.defaults = attr_defaults(merge_rules(rules, read_yaml))
+    def __init__(self, rules: List[_file_t], max_workers: Optional[int] = None):
+        self.attrs, self.defaults = attr_defaults(
+            merge_rules(rules, read_yaml, max_workers=max_workers)
+        )
 
-    def make_properties(self, confs: List[_file_t]):
+    def make_properties(self, confs: List[_file_t], max_workers: Optional[int] = None):
         self.props = properties(
-            self.attrs, self.defaults, merge_rules(confs, read_yaml)
+            self.attrs,
+            self.defaults,
+            merge_rules(confs, read_yaml, max_workers=max_workers),
         )
 
-    def add_nodes(self, attrs, confs: List[_file_t]):
+    def add_nodes(self, attrs, confs: List[_file_t], max_workers: Optional[int] = None):
         self.nodes = nodes(
-            merge_rules(attrs, read_yaml),
+            merge_rules(attrs, read_yaml, max_workers=max_workers),
             self.props,
-            merge_rules(confs, read_yaml),
+            merge_rules(confs, read_yaml, max_workers=max_workers),
         )
 
-    def add_edges(self, confs: List[_file_t]):
-        self.edges = edges(self.attrs, self.props, merge_rules(confs, read_yaml))
+    def add_edges(self, confs: List[_file_t], max_workers: Optional[int] = None):
+        self.edges = edges(
+            self.attrs,
+            self.props,
+            merge_rules(confs, read_yaml, max_workers=max_workers),
+        )
 
     @property
     def graph(self):
+        from networkx import Graph
+
         if not self._graph:
             self._graph = Graph()
             self._graph.add_nodes_from(self.nodes)
@@ -359,6 +643,8 @@ class Builder:
 
     @property
     def digraph(self):
+        from networkx import DiGraph
+
         if not self._digraph:
             self._graph = DiGraph()
             self._graph.add_nodes_from(self.nodes)
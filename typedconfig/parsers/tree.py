@@ -8,14 +8,17 @@ from collections import defaultdict
 from collections.abc import MutableSequence, MutableMapping
 from copy import deepcopy
 from dataclasses import field
-from functools import reduce
 from itertools import chain, product
 from operator import add
 from typing import (
     Any,
     Callable,
     Dict,
+    Hashable,
     Iterable,
+    Iterator,
+    List,
+    Optional,
     Set,
     Tuple,
     Type,
@@ -23,14 +26,13 @@ from typing import (
 )
 from warnings import warn
 
-from boltons.iterutils import research
-from glom import Path as gPath
-from glom import A, S, SKIP, T
-from glom import Assign, Coalesce, Delete, glom, Invoke, Iter, Match, Spec
-
+from typedconfig.engine import compile_validator
+from typedconfig.errors import collect_errors, ConfigValidationError
+from typedconfig.helpers import DocumentCache, fingerprint, hashable, LRUCache
 from typedconfig.helpers import merge_rules, NS
-from typedconfig.factory import make_typedconfig, make_validator
-from typedconfig.helpers import read_yaml
+from typedconfig.factory import make_typedconfig, make_validator, nested_types
+from typedconfig.factory import set_recipe
+from typedconfig.helpers import LayeredMapping, read_yaml
 from typedconfig.parsers import _ConfigIO, _fpaths
 
 # type specification keys, order of keys important
@@ -51,6 +53,14 @@ _type_spec = (
 _key_t = Union[str, int]  # mapping keys and sequence index
 _path_t = Tuple[_key_t, ...]
 
+# NOTE: glom, and boltons are only used by the dictionary traversal helpers
+# (`path_if`, `spec_to_type`, etc), they are imported where they are used so
+# that importing this module stays fast
+
+# config types built by `get_config_t`, keyed by a fingerprint of the rules;
+# cleared when the type or validator namespaces change
+config_t_cache = NS.add_cache(LRUCache(maxsize=32))
+
 
 def path_if(nested: Dict, test: Callable[[_path_t, _key_t, Any], bool]) -> Set[_path_t]:
     """Filter the list of paths with `test`
@@ -69,6 +79,8 @@ def path_if(nested: Dict, test: Callable[[_path_t, _key_t, Any], bool]) -> Set[_
         List of paths that pass `test`
 
     """
+    from boltons.iterutils import research
+
     return {path for path, _ in research(nested, query=test)}
 
 
@@ -145,6 +157,8 @@ def get_from_leaf(data: Dict, keys: Iterable[str]) -> Dict:
         Keys in the original hierarchy
 
     """
+    from glom import Assign, Coalesce, glom, Path as gPath, SKIP
+
     key_values = glom(
         data,
         {
@@ -178,6 +192,8 @@ def del_from_leaf(data: Dict, keys: Iterable[str]) -> Dict:
         Dictionary with the keys removed
 
     """
+    from glom import Delete, glom, Path as gPath
+
     return glom(
         data,
         tuple(
@@ -192,12 +208,10 @@ def leaf_subset(paths: Iterable[_path_t]) -> Set[_path_t]:
 
     Leaves are paths with no further downstream branches.
 
-    NOTE: if a path overlaps with another (given they are not the same), the
-    shorter path has branches ahead, and is not in the leaf subset.  The
-    implmentation assumes a path constitutes of unique keys:
-
-    - path: (k1, k2, k3)
-    - not path: (k1, k2, k1)
+    NOTE: if a path is a prefix of another (given they are not the same), the
+    shorter path has branches ahead, and is not in the leaf subset.  All
+    prefixes are collected in a single pass, so this is linear in the total
+    length of the paths.  Keys may repeat within a path, e.g. (k1, k2, k1).
 
     Parameters
     ----------
@@ -210,17 +224,45 @@ def leaf_subset(paths: Iterable[_path_t]) -> Set[_path_t]:
         List of paths to leaf nodes
 
     """
-
-    def __is_leaf(path: _path_t) -> bool:
-        return not any(set(path).issubset(q) for q in paths if path != q)
-
-    return {p for p in paths if __is_leaf(p)}
+    paths = set(paths)
+    prefixes = {path[:i] for path in paths for i in range(len(path))}
+    return paths - prefixes
 
 
 def get_type(value: Dict) -> Type:
     """Parse config and create the respective type"""
-    leaf_type = NS.types[value[_type_spec[0]]]
-    opts = value.get(_type_spec[1], None)
+    return make_type(value[_type_spec[0]], value.get(_type_spec[1], None))
+
+
+def make_type(name: str, opts: Any = None) -> Type:
+    """Create the type from its name in the type namespace, and options
+
+    Types with options (e.g. `conint(gt=0)`, or `Literal["a", "b"]`) are
+    cached in `type_cache`, keyed by the name, and the options; so identical
+    leaves share the same type.
+
+    """
+    if opts and isinstance(opts, (tuple, list, set, dict)):
+        # keyword options are normalised, the order of positional options
+        # is significant (e.g. Literal)
+        normalised = sorted(opts.items()) if isinstance(opts, dict) else opts
+        key: Hashable = (name, hashable(normalised))
+        try:
+            config_t = type_cache.get(key)
+        except TypeError:  # unhashable options, not cached
+            return _make_type(name, opts)
+        if config_t is None:
+            config_t = type_cache[key] = _make_type(name, opts)
+        return config_t
+    return _make_type(name, opts)
+
+
+# types with options, by the type name, and options (see `make_type`)
+type_cache = NS.add_cache(LRUCache(maxsize=1024))
+
+
+def _make_type(name: str, opts: Any) -> Type:
+    leaf_type = NS.types[name]
     if opts and isinstance(opts, (tuple, list, set)):
         config_t = leaf_type[tuple(NS.types.get(i, i) for i in opts)]
     elif opts and isinstance(opts, dict):
@@ -252,12 +294,39 @@ def get_validator(key: str, value: Dict) -> Dict[str, classmethod]:
         A dictionary, with the validator method name as key, and the validator
         classmethod as value
 
+    """
+    funcs, key, opts = parse_validator(key, value)
+    return dict(
+        chain.from_iterable(
+            make_validator(NS.validators[fn], key, opts=opts, **pars).items()
+            for fn, pars in funcs
+        )
+    )
+
+
+def parse_validator(key: str, value: Dict) -> Tuple[List[Tuple[str, Dict]], str, Dict]:
+    """Parse the validator specification in the config dictionary
+
+    Parameters
+    ----------
+    key : str
+        The config key to associate the validator with
+    value : Dict
+        The config dictionary
+
+    Returns
+    -------
+    Tuple[List[Tuple[str, Dict]], str, Dict]
+        List of validator function names and their parameters, the key to
+        associate the validators with (empty for root validators), and the
+        validator options
+
     """
     _1, _2, val_key, opts_key, params_key, is_root, *__ = _type_spec
     validators = value[val_key]
     params = value.get(params_key, {})
     if isinstance(validators, str):
-        funcs = [(NS.validators[validators], params)]
+        funcs = [(validators, params)]
     else:  # list of validators
         if not isinstance(validators, list):
             raise ValueError(f"{validators}: must be a 'str' or 'list'")
@@ -266,15 +335,14 @@ def get_validator(key: str, value: Dict) -> Dict[str, classmethod]:
             raise ValueError(
                 f"{validators}, {params}: no. of validators and param sets don't match"
             )
-        glom(params, Match([dict]))
-        funcs = [(NS.validators[fn], pars) for fn, pars in zip(validators, params)]
+        if not all(isinstance(_params, dict) for _params in params):
+            from glom import glom, Match
+
+            glom(params, Match([dict]))  # raises MatchError
+        funcs = list(zip(validators, params))
     key = "" if is_root in value else key  # don't actually use the value
     opts = value.get(opts_key, {})
-    return dict(
-        chain.from_iterable(
-            make_validator(fn, key, opts=opts, **pars).items() for fn, pars in funcs
-        )
-    )
+    return funcs, key, opts
 
 
 def str_to_spec(key: str, value: Dict) -> Dict:
@@ -308,6 +376,37 @@ def str_to_spec(key: str, value: Dict) -> Dict:
     return value
 
 
+def field_spec(key: str, _type: Type, default: Any = None) -> Tuple:
+    """Create the field specification as expected by `make_typedconfig`
+
+    Parameters
+    ----------
+    key : str
+        Field name
+    _type : Type
+        Field type
+    default
+        Default value; `None` means there is no default, use the sentinel
+        string `_None` to set `None` as the default
+
+    Returns
+    -------
+    Tuple
+        ``(key, type)``, or ``(key, type, field)`` when there is a default
+
+    """
+    if default is None:
+        return (key, _type)
+    # allow setting `None` as default by using the sentinel string `_None`
+    if default == "_None":
+        default = None
+    if isinstance(default, (MutableMapping, MutableSequence)):
+        _field = field(default_factory=lambda: default)
+    else:
+        _field = field(default=default)
+    return (key, _type, _field)
+
+
 def spec_to_type(
     key: str, value: Dict[str, Dict], bases: Tuple[Type, ...] = ()
 ) -> Type:
@@ -344,23 +443,13 @@ def spec_to_type(
         Custom type object with validators
 
     """
+    from glom import A, Coalesce, glom, Invoke, Iter, S, T
+
     type_k = _type_spec[0]
     default_k = _type_spec[6]
 
     def _type_w_defaults(key: str, value: Dict) -> Tuple:
-        _type = value[type_k]
-        _default = value.get(default_k)
-        if _default is not None:
-            # allow setting `None` as default by using the sentinel string `_None`
-            if _default == "_None":
-                _default = None
-            if isinstance(_default, (MutableMapping, MutableSequence)):
-                _field = field(default_factory=lambda: _default)
-            else:
-                _field = field(default=_default)
-            return (key, _type, _field)
-        else:
-            return (key, _type)
+        return field_spec(key, value[type_k], value.get(default_k))
 
     # convert to list of (key, value [, defaults]). apart from moving the data
     # members w/ a default argument later, original ordering is preserved
@@ -397,45 +486,295 @@ def spec_to_type(
     return make_typedconfig(f"{key}_t", _fields, namespace=ns, bases=bases)
 
 
-def nested_type(key: str, value: Dict[str, Dict]) -> Dict:
-    """Create the type dictionary for nested types (not leaf nodes)
+class RuleNode:
+    """A node in the compiled rules tree
+
+    The rules dictionary is compiled into a tree of nodes in a single pass
+    (see `compile_rules`).  The type builder, and optional key pruning work
+    on this tree instead of repeatedly traversing the rules dictionary.
+
+    Attributes
+    ----------
+    path : Tuple[_key_t, ...]
+        Path to the node
+    kind : str
+        "leaf" for a type specification, or "branch" for a nested section
+    type : Union[str, Type, None]
+        Type of a leaf node
+    opts
+        Options for the leaf type
+    validator : Dict
+        The validator specification keys (`validator`, `validator_opts`,
+        `validator_params`, `root_validator`), empty if there are none
+    default
+        Default value of a leaf node, `None` if there is no default
+    optional : bool
+        Whether a leaf node is optional
+    children : Dict[_key_t, RuleNode]
+        Child nodes of a branch, in the same order as the rules
+
+    """
+
+    __slots__ = (
+        "path",
+        "kind",
+        "type",
+        "opts",
+        "validator",
+        "default",
+        "optional",
+        "children",
+    )
+
+    def __init__(
+        self,
+        path: _path_t,
+        kind: str,
+        type: Union[str, Type, None] = None,
+        opts: Any = None,
+        validator: Optional[Dict] = None,
+        default: Any = None,
+        optional: bool = False,
+        children: Optional[Dict[_key_t, RuleNode]] = None,
+    ):
+        self.path = path
+        self.kind = kind
+        self.type = type
+        self.opts = opts
+        self.validator = {} if validator is None else validator
+        self.default = default
+        self.optional = optional
+        self.children = {} if children is None else children
+
+    @property
+    def is_leaf(self) -> bool:
+        return self.kind == "leaf"
+
+    def spec(self) -> Dict:
+        """Type specification of a leaf node, as expected by `get_type`"""
+        return {_type_spec[0]: self.type, _type_spec[1]: self.opts}
+
+    def walk(self) -> Iterator[RuleNode]:
+        """Iterate over the tree, parents before children"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children.values()))
+
+    def bottom_up(self) -> List[RuleNode]:
+        """Branches in the tree, children before parents
+
+        Branches are bucketed by depth, and the buckets are ordered deepest
+        first; so every branch is visited exactly once, after all its
+        children.
+
+        """
+        buckets: Dict[int, List[RuleNode]] = defaultdict(list)
+        for node in self.walk():
+            if not node.is_leaf:
+                buckets[len(node.path)].append(node)
+        depths = sorted(buckets, reverse=True)
+        return [node for depth in depths for node in buckets[depth]]
+
+    def replace(self, **kwargs) -> RuleNode:
+        """Return a copy of the node with the given attributes replaced"""
+        attrs = {attr: getattr(self, attr) for attr in self.__slots__}
+        return type(self)(**{**attrs, **kwargs})
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.path!r}, {self.kind!r})"
+
+
+# keys of the validator specification
+_validator_spec = _type_spec[2:6]
+
+
+def compile_rules(rules: Dict) -> RuleNode:
+    """Compile the rules dictionary into a tree of `RuleNode`
+
+    The root of the tree is always a branch.  Type specification keys at the
+    root level (e.g. a root validator) are associated with the root node.  Any
+    value that is neither a type specification nor a nested section is
+    ignored, as it does not contribute to the config type.
 
     Parameters
     ----------
-    key : str
-        The key name corresponding to the specification. It is used as a
-        template for the custom type name.
-    value : Dict[str, Dict]
-        The config dictionary
+    rules : Dict
+        Rules dictionary
 
     Returns
     -------
-    Dict
-        The dictionary with the specifications:
-          { "type": <type>, "validator": <validator> }
+    RuleNode
+        Root node of the compiled tree
 
     """
-    # parse validator before type creation
-    return {
-        "validator": str_to_spec(key, value),
-        "type": spec_to_type(key, value),
-    }
+    type_key, opts_key, *_, default_key, optional_key, __ = _type_spec
+
+    def _compile(path: _path_t, value: Dict, root: bool = False) -> RuleNode:
+        validator = {k: value[k] for k in _validator_spec if k in value}
+        if type_key in value and not root:
+            return RuleNode(
+                path,
+                "leaf",
+                type=value[type_key],
+                opts=value.get(opts_key),
+                validator=validator,
+                default=value.get(default_key),
+                optional=value.get(optional_key, False),
+            )
+        children = {
+            key: _compile(path + (key,), val)
+            for key, val in value.items()
+            if key not in _type_spec and isinstance(val, dict)
+        }
+        return RuleNode(path, "branch", validator=validator, children=children)
 
+    return _compile((), rules, root=True)
 
-def bind_updater(func: Callable[[str, Dict], Dict]) -> Callable[[Dict, _path_t], Dict]:
-    """Bind the given function to `update_inplace` defined below"""
 
-    def update_inplace(_conf: Dict, path: _path_t) -> Dict:
-        """Invoke the bound function to reassign matching items
+def prune_optional(node: RuleNode, conf: Any) -> RuleNode:
+    """Drop optional leaf nodes that are absent in the config
 
-        FIXME: possibly this can be simplified using functools.partial
+    Subtrees without any change are shared with the original tree.
 
-        """
-        glom_spec = gPath(*path)
-        _config_t = Spec(Invoke(func).constants(path[-1]).specs(glom_spec))
-        return glom(_conf, Assign(glom_spec, _config_t))
+    Parameters
+    ----------
+    node : RuleNode
+        Compiled rules tree
+    conf
+        Config dictionary corresponding to the node
 
-    return update_inplace
+    Returns
+    -------
+    RuleNode
+        Pruned rules tree
+
+    """
+    children = {}
+    for key, child in node.children.items():
+        present = isinstance(conf, dict) and key in conf
+        if child.is_leaf:
+            if present or not child.optional:
+                children[key] = child
+        else:
+            children[key] = prune_optional(child, conf[key] if present else None)
+    unchanged = len(children) == len(node.children) and all(
+        children[key] is child for key, child in node.children.items()
+    )
+    return node if unchanged else node.replace(children=children)
+
+
+def build_type(
+    node: RuleNode,
+    name: str = "config",
+    bases: Tuple[Type, ...] = (),
+    reuse: Optional[Dict[_path_t, Type]] = None,
+) -> Type:
+    """Create the config type from a compiled rules tree
+
+    The types for nested sections are created first (see
+    `RuleNode.bottom_up`).  Validators on a leaf are added to the parent
+    type, and root validators on a section are added to the type of the
+    section itself; like the traversal based implementation, other validators
+    on a section, and root validators on a leaf are ignored.
+
+    Nested sections with identical rules (see `branch_digests`) share one
+    type; only the field names in the parents differ.  The type is named
+    after all the keys that share it, e.g. "costs|other_costs_t", so that
+    error messages do not point to a different section.
+
+    Parameters
+    ----------
+    node : RuleNode
+        Branch node
+    name : str (default: "config")
+        The key name corresponding to the node, it is used as a template for
+        the type name.
+    bases : Tuple[Type, ...]
+        Base classes
+    reuse : Dict[_path_t, Type] (optional)
+        Previously built types of branches to reuse instead, by path (see
+        `IncrementalBuilder`)
+
+    Returns
+    -------
+    Type
+        Custom type object with validators
+
+    """
+    reuse = {} if reuse is None else reuse
+    types: Dict[_path_t, Type] = {}
+    # nested sections with identical rules share a type
+    digests = branch_digests(node)
+    shared: Dict[str, Type] = {}
+    keys: Dict[str, List[str]] = {}  # keys of the sections sharing a type
+    for path, digest in digests.items():
+        if path and str(path[-1]) not in keys.setdefault(digest, []):
+            keys[digest].append(str(path[-1]))
+    for branch in node.bottom_up():
+        if branch.path in reuse:
+            types[branch.path] = reuse[branch.path]
+            continue
+        digest = digests[branch.path]
+        if branch is not node and digest in shared:
+            types[branch.path] = shared[digest]
+            continue
+        key = name if branch is node else str(branch.path[-1])
+        _fields: List[Tuple] = []
+        _defaults: List[Tuple] = []
+        for _key, child in branch.children.items():
+            if child.is_leaf:
+                item = field_spec(str(_key), get_type(child.spec()), child.default)
+            else:
+                item = field_spec(str(_key), types.pop(child.path))
+            # only leaf nodes have defaults, which should come after the rest
+            (_defaults if len(item) == 3 else _fields).append(item)
+        namespace: Dict[str, classmethod] = {}
+        for _key, spec in branch_validators(branch, key):
+            namespace.update(get_validator(_key, spec))
+        type_name = name if branch is node else "|".join(keys[digest])
+        types[branch.path] = make_typedconfig(
+            f"{type_name}_t",
+            _fields + _defaults,
+            namespace=namespace,
+            bases=bases if branch is node else (),
+        )
+        shared[digest] = types[branch.path]
+    return types[node.path]
+
+
+def branch_validators(branch: RuleNode, key: str) -> List[Tuple[str, Dict]]:
+    """Validator specifications that belong to the type of a branch
+
+    These are the root validators of the branch itself, and the (key)
+    validators on its leaves.  Key validators on the nested sections, and
+    root validators on the leaves are ignored.
+
+    Parameters
+    ----------
+    branch : RuleNode
+        Branch node
+    key : str
+        The key name corresponding to the branch
+
+    Returns
+    -------
+    List[Tuple[str, Dict]]
+        List of key name, and the validator specification
+
+    """
+    is_root = _type_spec[5]
+    validators = []
+    if branch.validator:
+        if is_root not in branch.validator and not branch.path:
+            raise ValueError(f"{branch.validator}: top level validators must be root")
+        if is_root in branch.validator:
+            validators.append((key, branch.validator))
+    for _key, child in branch.children.items():
+        if child.is_leaf and child.validator and is_root not in child.validator:
+            validators.append((str(_key), child.validator))
+    return validators
 
 
 def get_spec(rules: Dict) -> Tuple[Dict[str, Dict], Set, Set]:
@@ -451,29 +790,172 @@ def get_spec(rules: Dict) -> Tuple[Dict[str, Dict], Set, Set]:
     Returns
     -------
     Tuple[Dict[str, Dict], Set, Set]
-        Config specification, set of paths, set of leaf nodes
+        Config specification, set of paths to sections and leaf nodes, set of
+        leaf nodes
 
     """
-    paths = path_if(rules, is_node)
-    leaves = path_if(rules, is_leaf)
+    # create a copy of the dictionary, and update the leaf nodes
+    spec = deepcopy(rules)
+    paths, leaves = set(), set()
+
+    def _update(node: RuleNode, value: Dict):
+        for key, child in node.children.items():
+            paths.add(child.path)
+            if child.is_leaf:
+                leaves.add(child.path)
+                str_to_spec(str(key), value[key])
+            else:
+                _update(child, value[key])
 
-    # create a copy of the dictionary, and recursively update the leaf nodes
-    spec = reduce(bind_updater(str_to_spec), leaves, deepcopy(rules))
+    _update(compile_rules(rules), spec)
     return spec, paths, leaves
 
 
-def get_config_t(rules: Dict) -> Type:
-    """Read the config dictionary and create the config type"""
-    _conf, paths, leaves = get_spec(rules)
+def get_config_t(rules: Dict, cache: bool = True) -> Type:
+    """Read the config dictionary and create the config type
+
+    Building the config type is expensive, so the types are cached in
+    `config_t_cache`, keyed by a fingerprint of the rules, and the modules
+    that populate the type and validator namespaces.  The cache is cleared
+    whenever the namespaces are reset (e.g. by `NS.add_modules`).
+
+    The config type, and its nested types are stamped with a recipe (the
+    rules, and their fingerprint), so that they can be pickled, and rebuilt in
+    another process (see `typedconfig.factory.set_recipe`).
+
+    Parameters
+    ----------
+    rules : Dict
+        Rules dictionary (after merging, and resolving optional keys)
+    cache : bool (default: True)
+        Reuse a previously built config type for identical rules
+
+    Returns
+    -------
+    Type
+        Config type
+
+    """
+    key = (fingerprint(rules), NS.modules)
+    if not cache:
+        return _get_config_t(rules, key)
+
+    config_t = config_t_cache.get(key)
+    if config_t is None:
+        config_t = config_t_cache[key] = _get_config_t(rules, key)
+    return config_t
+
+
+def _get_config_t(rules: Dict, key: Tuple) -> Type:
+    config_t = build_type(compile_rules(rules), "config", bases=(_ConfigIO,))
+    args = (deepcopy(rules),)  # rules might be modified later
+    for path, _type in nested_types(config_t):
+        set_recipe(_type, get_config_t, key, args, path)
+    return config_t
+
+
+def branch_digests(node: RuleNode) -> Dict[_path_t, str]:
+    """Content digest of every branch in a compiled rules tree
+
+    The digest of a branch covers its validators, its leaves, and the digests
+    of its nested sections (like a Merkle tree).  So a change anywhere in a
+    subtree changes the digest of the branch, and of all its ancestors, and
+    nothing else.
+
+    Parameters
+    ----------
+    node : RuleNode
+        Branch node
+
+    Returns
+    -------
+    Dict[_path_t, str]
+        Digests by the path of the branch
+
+    """
+    digests: Dict[_path_t, str] = {}
+    for branch in node.bottom_up():
+        children = [
+            (
+                (
+                    key,
+                    child.type,
+                    child.opts,
+                    child.validator,
+                    child.default,
+                    child.optional,
+                )
+                if child.is_leaf
+                else (key, digests[child.path])
+            )
+            for key, child in branch.children.items()
+        ]
+        digests[branch.path] = fingerprint([branch.validator, children])
+    return digests
+
+
+class IncrementalBuilder:
+    """Rebuild the config type incrementally as the rules change
 
-    # walk up the tree, and process the "new" leaf nodes.  using a set takes
-    # care of duplicates.
-    branches: Set[_path_t] = leaf_subset(paths - leaves)
-    while branches:
-        _conf = reduce(bind_updater(nested_type), branches, _conf)
-        branches = leaf_subset(path[:-1] for path in branches if path[:-1])
+    The builder keeps the types of every section from the previous build,
+    keyed by the path, and the content digest of the section (see
+    `branch_digests`).  On a new rules dictionary, only the sections that
+    changed, and their ancestors are built again; the types of untouched
+    sections (and their validators) are reused.
 
-    return spec_to_type("config", _conf, bases=(_ConfigIO,))
+    >>> builder = IncrementalBuilder()  # doctest: +SKIP
+    >>> config_t = builder.build(rules)  # doctest: +SKIP
+    >>> rules["a"]["b"]["type"] = "float"  # doctest: +SKIP
+    >>> config_t = builder.build(rules)  # doctest: +SKIP
+
+    Only the type of section "a", and the config type are built again.  The
+    config type is shared with `get_config_t` (see `config_t_cache`), and
+    like there, the types are stamped with a recipe, so they can be pickled.
+
+    """
+
+    def __init__(self) -> None:
+        self.types: Dict[Tuple[_path_t, str], Type] = {}
+        self.modules = NS.modules
+
+    def build(self, rules: Dict) -> Type:
+        """Build the config type, reusing the types of unchanged sections
+
+        Parameters
+        ----------
+        rules : Dict
+            Rules dictionary (after merging, and resolving optional keys)
+
+        Returns
+        -------
+        Type
+            Config type
+
+        """
+        if self.modules != NS.modules:  # types might resolve differently
+            self.types.clear()
+            self.modules = NS.modules
+        root = compile_rules(rules)
+        digests = branch_digests(root)
+        key = (fingerprint(rules), NS.modules)
+        config_t = config_t_cache.get(key)
+        if config_t is None:
+            reuse = {
+                path: self.types[(path, digest)]
+                for path, digest in digests.items()
+                if (path, digest) in self.types
+            }
+            config_t = build_type(root, "config", (_ConfigIO,), reuse)
+            args = (deepcopy(rules),)
+            for path, _type in nested_types(config_t):
+                set_recipe(_type, get_config_t, key, args, path)
+            config_t_cache[key] = config_t
+
+        # only keep the types of the latest build
+        self.types = {
+            (path, digests[path]): _type for path, _type in nested_types(config_t)
+        }
+        return config_t
 
 
 def is_optional(path: _path_t, key: _key_t, value: Any) -> bool:
@@ -527,22 +1009,31 @@ def is_mandatory(path: _path_t, key: _key_t, value: Any) -> bool:
 
 
 def resolve_optional(rules: Dict, conf: Dict) -> Dict:
-    """Go through the rules and drop optional keys that are absent in conf"""
-    # leaves defined in rules
-    leaves = path_if(rules, is_leaf)
-    # keys present in config; also contains keys from dictionary that are part
-    # of the config, e.g. validator_params, or keyword options to type
-    keys = path_if(conf, is_node)
-    # valid_leaves ∩ keys = valid_leaves present in config
-    present = leaves.intersection(keys)
-    for node in path_if(rules, is_optional):
-        if node not in present:
-            # delete unused optional rules
-            glom(rules, Delete(gPath(*node)))
+    """Go through the rules and drop optional keys that are absent in conf
+
+    NOTE: the rules dictionary is modified in place.
+
+    """
+
+    def _drop(node: RuleNode, pruned: RuleNode, value: Dict):
+        for key, child in node.children.items():
+            if key not in pruned.children:
+                del value[key]  # delete unused optional rules
+            elif pruned.children[key] is not child:
+                _drop(child, pruned.children[key], value[key])
+
+    root = compile_rules(rules)
+    _drop(root, prune_optional(root, conf), rules)
     return rules
 
 
-def get_config(rule_files: _fpaths, conf_files: _fpaths):
+def get_config(
+    rule_files: _fpaths,
+    conf_files: Union[_fpaths, LayeredMapping],
+    engine: str = "pydantic",
+    fail_fast: bool = True,
+    cache: Optional[DocumentCache] = None,
+):
     """Return the config object
 
     Both rules files and config files are first merged, then a config type is
@@ -556,15 +1047,44 @@ def get_config(rule_files: _fpaths, conf_files: _fpaths):
     ----------
     rule_files : Path | List[Path]
 
-    conf_files : Path | List[Path]
+    conf_files : Path | List[Path] | LayeredMapping
+        Config files, or a lazily merged view of config documents (see
+        `merge_rules`)
+
+    engine : str (default: "pydantic")
+        Validation engine, either "pydantic", or "fast" to validate with a
+        compiled function (see `typedconfig.engine`)
+
+    fail_fast : bool (default: True)
+        Raise the first validation error.  Otherwise, when validation fails,
+        every section of the config is validated, and all errors are reported
+        together.
+
+    cache : DocumentCache (optional)
+        Cache of parsed rules, and config files (see `merge_rules`)
 
     Returns
     -------
     Config
         Config object after validation
 
+    Raises
+    ------
+    ConfigValidationError
+        With all validation errors, if `fail_fast` is false
+
     """
-    rules = merge_rules(rule_files, read_yaml)
-    confs = merge_rules(conf_files, read_yaml)
+    if engine not in ("pydantic", "fast"):
+        raise ValueError(f"{engine!r}: unknown validation engine")
+    rules = merge_rules(rule_files, read_yaml, cache)
+    confs = merge_rules(conf_files, read_yaml, cache)
     config_t = get_config_t(resolve_optional(rules, confs))
-    return config_t(**confs)
+    try:
+        if engine == "fast":
+            return compile_validator(config_t)(confs)
+        return config_t(**confs)
+    except (ValueError, TypeError) as err:
+        errors = [] if fail_fast else collect_errors(config_t, confs)
+        if not errors:
+            raise
+        raise ConfigValidationError(errors) from err
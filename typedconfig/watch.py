@@ -0,0 +1,278 @@
+"""Validate a config again whenever its rules, or config files change
+
+>>> def report(config, errors):  # doctest: +SKIP
+...     print("\\n".join(map(str, errors)) if errors else "valid")
+>>> watcher = watch(["rules.yaml"], ["conf.yaml", "local.yaml"], report)  # doctest: +SKIP
+>>> watcher.stop()  # doctest: +SKIP
+
+Changes are detected with inotify on Linux, and by polling the modification
+time of the files elsewhere.  Revalidating is incremental:
+
+- files are read through a `DocumentCache`, so only modified files are
+  parsed again
+- the config type is built by an `IncrementalBuilder`; so when only config
+  files change the type is reused, and when the rules change only the edited
+  sections are built again
+- sections of the config whose values (and type) are unchanged since the
+  last valid config are reused as is, without validating them again
+
+As a consequence, successive configs passed to the callback share the
+instances of unchanged sections; the callback should not modify them.
+
+"""
+
+import ctypes
+from ctypes.util import find_library
+from dataclasses import fields, is_dataclass
+import os
+from pathlib import Path
+import select
+import struct
+from threading import Event, Thread
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type, Union
+
+from typedconfig.engine import compile_validator
+from typedconfig.errors import collect_errors, ConfigError
+from typedconfig.helpers import DocumentCache, freeze, merge_rules, read_yaml
+from typedconfig.parsers import _fpaths
+from typedconfig.parsers.tree import IncrementalBuilder, resolve_optional
+
+_callback_t = Callable[[Optional[Any], List[ConfigError]], None]
+
+# inotify(7) events: a file was written, created, replaced, or deleted
+_IN_CLOSE_WRITE, _IN_MOVED_TO, _IN_CREATE, _IN_DELETE = 0x8, 0x80, 0x100, 0x200
+_event_t = struct.Struct("iIII")  # wd, mask, cookie, len (followed by name)
+
+
+class _Inotify:
+    """Wait for changes to a set of files with inotify(7)
+
+    The parent directories are watched instead of the files, as editors often
+    save a file by replacing it.
+
+    """
+
+    mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+    def __init__(self, paths: List[Path]):
+        libc = ctypes.CDLL(find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.names: Dict[int, Set[str]] = {}
+        for path in paths:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(path.parent), self.mask)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                self.close()
+                raise OSError(errno, os.strerror(errno), str(path.parent))
+            self.names.setdefault(wd, set()).add(path.name)
+
+    def wait(self, timeout: float) -> bool:
+        """Wait for a change, returns false on timeout"""
+        changed = False
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return changed
+        while True:
+            try:
+                buf = os.read(self.fd, 2**16)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(buf):
+                wd, _, _, size = _event_t.unpack_from(buf, offset)
+                offset += _event_t.size
+                name = os.fsdecode(buf[offset : offset + size].rstrip(b"\0"))
+                offset += size
+                changed = changed or name in self.names.get(wd, ())
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _Poll:
+    """Wait for changes to a set of files by polling their modification time"""
+
+    def __init__(self, paths: List[Path]):
+        self.paths = paths
+        self.stats = self._stat()
+
+    def _stat(self) -> List[Optional[Tuple[int, int]]]:
+        stats: List[Optional[Tuple[int, int]]] = []
+        for path in self.paths:
+            try:
+                stat = path.stat()
+            except OSError:  # e.g. while an editor replaces the file
+                stats.append(None)
+            else:
+                stats.append((stat.st_mtime_ns, stat.st_size))
+        return stats
+
+    def wait(self, timeout: float) -> bool:
+        """Wait for a change, returns false on timeout"""
+        time.sleep(timeout)
+        stats = self._stat()
+        changed, self.stats = stats != self.stats, stats
+        return changed
+
+    def close(self):
+        pass
+
+
+def _as_list(fpaths: _fpaths) -> List[Path]:
+    if not isinstance(fpaths, (list, tuple)):
+        fpaths = [fpaths]
+    return [Path(fpath) for fpath in fpaths]
+
+
+def _reuse(config_t: Type, conf: Dict, prev_conf: Dict, prev: Any) -> Dict:
+    """Replace sections unchanged since the previous config by their instance
+
+    A section is unchanged if its values are the same, and it has the same
+    type; instances are not validated again (see `_ConfigIO.__post_init__`).
+
+    """
+    data = dict(conf)
+    for field in fields(config_t):
+        value, prev_value = conf.get(field.name), prev_conf.get(field.name)
+        if not isinstance(field.type, type) or not is_dataclass(field.type):
+            continue
+        if not isinstance(value, dict):
+            continue
+        if not isinstance(prev_value, dict):
+            continue
+        instance = getattr(prev, field.name, None)
+        if type(instance) is field.type and value == prev_value:
+            data[field.name] = instance
+        elif is_dataclass(instance):  # the type, or some values changed
+            data[field.name] = _reuse(field.type, value, prev_value, instance)
+    return data
+
+
+class Watcher:
+    """Validate a config whenever its rules, or config files change
+
+    Parameters
+    ----------
+    rule_files : Path | List[Path]
+        Rules files, like `get_config`
+    conf_files : Path | List[Path]
+        Config files, like `get_config`
+    callback : Callable[[Config | None, List[ConfigError]], None]
+        Called with the config, and an empty list of errors after every
+        change; if the config is invalid, with `None`, and the errors.  Errors
+        not related to validation (e.g. a YAML syntax error) are reported with
+        an empty location, and the exception name as type.
+    engine : str (default: "pydantic")
+        Validation engine, see `get_config`
+    interval : float (default: 0.1)
+        How often to check if the watcher was stopped (in seconds), and with
+        polling, how often to check the files
+    poll : bool (default: False)
+        Poll the modification time of the files, even if inotify is available
+
+    """
+
+    def __init__(
+        self,
+        rule_files: _fpaths,
+        conf_files: _fpaths,
+        callback: _callback_t,
+        *,
+        engine: str = "pydantic",
+        interval: float = 0.1,
+        poll: bool = False,
+    ):
+        if engine not in ("pydantic", "fast"):
+            raise ValueError(f"{engine!r}: unknown validation engine")
+        self.rule_files = _as_list(rule_files)
+        self.conf_files = _as_list(conf_files)
+        self.callback = callback
+        self.engine = engine
+        self.interval = interval
+        self.poll = poll
+        self.cache = DocumentCache()
+        self.builder = IncrementalBuilder()
+        # values, and instance of the last valid config
+        self._last: Optional[Tuple[Dict, Any]] = None
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    def check(self) -> Tuple[Optional[Any], List[ConfigError]]:
+        """Validate the config, and call back with the result"""
+        try:
+            rules = merge_rules(self.rule_files, read_yaml, self.cache)
+            confs = merge_rules(self.conf_files, read_yaml, self.cache)
+            config_t = self.builder.build(resolve_optional(rules, confs))
+        except Exception as err:
+            result = None, [ConfigError("", type(err).__name__, str(err))]
+        else:
+            result = self._validate(config_t, confs)
+        self.callback(*result)
+        return result
+
+    def _validate(
+        self, config_t: Type, confs: Dict
+    ) -> Tuple[Optional[Any], List[ConfigError]]:
+        data = confs if self._last is None else _reuse(config_t, confs, *self._last)
+        try:
+            if self.engine == "fast":
+                config = compile_validator(config_t)(data)
+            else:
+                config = config_t(**data)
+        except (ValueError, TypeError) as err:
+            errors = collect_errors(config_t, confs)
+            return None, errors or [ConfigError("", type(err).__name__, str(err))]
+        # frozen, so that changes to the config do not leak into the values
+        self._last = (freeze(confs), config)
+        return config, []
+
+    def _changes(self) -> Union[_Inotify, _Poll]:
+        paths = [fpath.resolve() for fpath in self.rule_files + self.conf_files]
+        if not self.poll:
+            try:
+                return _Inotify(paths)
+            except (AttributeError, OSError):  # not Linux, or too many watches
+                pass
+        return _Poll(paths)
+
+    def run(self):
+        """Validate the config, and then again after every change (blocking)"""
+        changes = self._changes()
+        try:
+            self.check()
+            while not self._stop.is_set():
+                if changes.wait(self.interval):
+                    self.check()
+        finally:
+            changes.close()
+
+    def start(self) -> "Watcher":
+        """Run the watcher in a background thread"""
+        self._stop.clear()
+        self._thread = Thread(target=self.run, name="typedconfig-watch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the watcher, and wait for the background thread to finish"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def watch(
+    rule_files: _fpaths, conf_files: _fpaths, callback: _callback_t, **kwargs
+) -> Watcher:
+    """Start watching a config in a background thread, see `Watcher`
+
+    Returns
+    -------
+    Watcher
+        The watcher, call `Watcher.stop` to stop it
+
+    """
+    return Watcher(rule_files, conf_files, callback, **kwargs).start()